@@ -0,0 +1,403 @@
+import asyncio
+import os
+import uuid
+from typing import Dict, List, Optional, Any, Iterable, Awaitable, TypeVar
+
+import aiohttp
+
+from QonicApiLib import QonicApiError, ModificationInputError, ProductFilter
+from jsonCodec import JsonCodec, get_codec
+from oauth import load_env
+from singleFlight import AsyncSingleFlight
+from tokenManager import TokenManager
+
+T = TypeVar("T")
+
+
+class AsyncResponse:
+    def __init__(self, status_code: int, reason: str, headers: Dict[str, str], content: bytes, codec: JsonCodec):
+        self.codec = codec
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return self.codec.loads(self.content)
+
+
+class AsyncQonicApi:
+    def __init__(self, *, limit: int = 100, limit_per_host: int = 10, access_token: Optional[str] = None,
+                 codec: JsonCodec | None = None):
+        load_env()
+        self.base_url = os.getenv("QONIC_API_URL", "https://api.qonic.com/v1/").rstrip("/") + "/"
+        self.codec = codec or get_codec()
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.session: aiohttp.ClientSession | None = None
+        self.session_id = self.new_session_id()
+        self.tokens = TokenManager(self._refresh)
+        if access_token:
+            self.access_token = access_token
+        self.single_flight = AsyncSingleFlight()
+
+    @property
+    def access_token(self) -> Optional[str]:
+        return self.tokens.access_token
+
+    @access_token.setter
+    def access_token(self, value: str) -> None:
+        self.tokens.set({"access_token": value})
+
+    @staticmethod
+    def _refresh(refresh_token: str) -> Optional[Dict[str, Any]]:
+        from oauth import refresh
+        return refresh(refresh_token)
+
+    async def __aenter__(self) -> "AsyncQonicApi":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        self.tokens.close()
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _client(self) -> aiohttp.ClientSession:
+        # One pool for the lifetime of the client; limit_per_host bounds the fan-out per API host.
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    def _url(self, path: str) -> str:
+        path = path.lstrip("/")
+        return self.base_url + path
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {
+            "Accept": "application/json",
+            "X-Client-Session-Id": self.session_id
+        }
+        authorization = self.tokens.authorization
+        if authorization:
+            headers["Authorization"] = authorization
+        return headers
+
+    async def _request(
+            self,
+            method: str,
+            path: str,
+            *,
+            params: Dict[str, Any] | None = None,
+            json: Any = None,
+            data: Any = None,
+            allow_redirects: bool = True,
+    ) -> AsyncResponse:
+        url = self._url(path)
+        headers = self._headers()
+        if json is not None:
+            data = self.codec.dumps(json)
+            headers["Content-Type"] = "application/json"
+        reauthorized = False
+        while True:
+            authorization = headers.get("Authorization")
+            async with self._client().request(
+                method,
+                url,
+                params=params,
+                data=data,
+                headers=headers,
+                allow_redirects=allow_redirects,
+            ) as raw:
+                resp = AsyncResponse(raw.status, raw.reason or "", dict(raw.headers), await raw.read(), self.codec)
+            # Renewal does blocking I/O, so it runs off the event loop; other coroutines keep going
+            if resp.status_code == 401 and not reauthorized and await asyncio.get_running_loop().run_in_executor(
+                    None, self.tokens.renew_now, authorization):
+                reauthorized = True
+                headers.update(self._headers())
+                continue
+            break
+        if not resp.ok:
+            raise QonicApiError(resp)
+        return resp
+
+    async def get(self, path: str, params: Dict[str, Any] | None = None, **kwargs) -> Any:
+        if kwargs:
+            return (await self._request("GET", path, params=params, **kwargs)).json()
+        key = ("GET", self.session_id, self._url(path), tuple(sorted((params or {}).items())))
+
+        async def load() -> Any:
+            return (await self._request("GET", path, params=params)).json()
+
+        return await self.single_flight.do(key, load)
+
+    async def _send(self, method: str, path: str, **kwargs) -> Any:
+        resp = await self._request(method, path, **kwargs)
+        if resp.content:
+            try:
+                return resp.json()
+            except ValueError:
+                return resp.text
+        return None
+
+    async def _post(self, path: str, **kwargs) -> Any:
+        return await self._send("POST", path, **kwargs)
+
+    async def _delete(self, path: str, **kwargs) -> Any:
+        return await self._send("DELETE", path, **kwargs)
+
+    async def _put(self, path: str, **kwargs) -> Any:
+        return await self._send("PUT", path, **kwargs)
+
+    async def gather(self, calls: Iterable[Awaitable[T]], *, concurrency: Optional[int] = None,
+                     return_exceptions: bool = False) -> List[T]:
+        semaphore = asyncio.Semaphore(concurrency or self.limit_per_host)
+
+        async def bounded(call: Awaitable[T]) -> T:
+            async with semaphore:
+                return await call
+
+        return await asyncio.gather(*(bounded(c) for c in calls), return_exceptions=return_exceptions)
+
+    async def authorize(self):
+        from oauth import default_token_store, get_token
+        store = default_token_store()
+        self.tokens.store = store
+        self.tokens.set(await asyncio.get_running_loop().run_in_executor(None, get_token, store))
+
+    async def list_projects(self) -> List[Any]:
+        return (await self.get("projects")).get("projects", [])
+
+    async def list_models(self, project_id: str) -> List[Any]:
+        return (await self.get(f"projects/{project_id}/models")).get("models", [])
+
+    async def get_available_product_fields(self, project_id: str, model_id: str) -> List[str]:
+        data = await self.get(f"projects/{project_id}/models/{model_id}/products/properties/available-data")
+        return data.get("fields", [])
+
+    async def query_products(
+            self,
+            project_id: str,
+            model_id: str,
+            fields: Iterable[str],
+            filters: Iterable[ProductFilter] | None = None
+    ) -> Dict[str, Any]:
+        body = {
+            "fields": list(fields),
+            "filters": filters or {},
+        }
+        result = await self._post(f"projects/{project_id}/models/{model_id}/products/properties/query", json=body)
+        return result.get("result", {})
+
+    async def calculate_quantities(self, project_id: str, model_id: str, calculators: Iterable[str],
+                                   filters: Iterable[ProductFilter] | None = None) -> Dict[str, Any]:
+        body = {
+            "calculators": list(calculators),
+            "filters": filters or {},
+        }
+        return await self._post(f"projects/{project_id}/models/{model_id}/products/quantities/query", json=body)
+
+    async def _redirect_location(self, path: str) -> str:
+        resp = await self._request("GET", path, allow_redirects=False)
+        location = resp.headers.get("Location")
+        if not location:
+            raise QonicApiError(resp)
+        return location
+
+    async def get_quantities_result_url(self, project_id: str, model_id: str, operation_id: str) -> str:
+        return await self._redirect_location(
+            f"projects/{project_id}/models/{model_id}/products/quantities/{operation_id}/result")
+
+    async def get_operation(self, operation_id: str) -> Dict[str, Any]:
+        return await self.get(f"operations/{operation_id}")
+
+    @staticmethod
+    def new_session_id() -> str:
+        return str(uuid.uuid4())
+
+    async def start_session(self, project_id: str, model_id: str) -> None:
+        self.session_id = self.new_session_id()
+        await self._post(f"projects/{project_id}/models/{model_id}/start-session")
+
+    async def end_session(self, project_id: str, model_id: str) -> None:
+        await self._post(f"projects/{project_id}/models/{model_id}/end-session")
+
+    async def modify_products(self, project_id: str, model_id: str, changes: Dict[str, Any]) -> List[ModificationInputError]:
+        result = await self._post(f"projects/{project_id}/models/{model_id}/products", json=changes)
+        errors_json = result.get("errors", []) if isinstance(result, dict) else []
+        return [ModificationInputError(**e) for e in errors_json]
+
+    async def delete_product(self, project_id: str, model_id: str, guid: str) -> None:
+        await self._delete(f"projects/{project_id}/models/{model_id}/products/{guid}")
+
+    async def publish_changes(self, project_id: str, model_id: str, title: Optional[str] = None,
+                              description: Optional[str] = None) -> None:
+        body = {
+            "title": title,
+            "description": description,
+        }
+        await self._post(f"projects/{project_id}/models/{model_id}/publish", json=body)
+
+    async def discard_changes(self, project_id: str, model_id: str) -> None:
+        await self._post(f"projects/{project_id}/models/{model_id}/discard")
+
+    async def get_upload_url(self) -> str:
+        data = await self.get("upload-url")
+        return data["uploadUrl"]
+
+    async def create_model(
+            self,
+            project_id: str,
+            *,
+            model_name: str,
+            upload_url: str,
+            upload_file_name: str,
+            tags: Optional[List[str]] = None,
+            default_role: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        body = {
+            "modelName": model_name,
+            "uploadUrl": upload_url,
+            "uploadFileName": upload_file_name,
+        }
+        if tags is not None:
+            body["tags"] = tags
+        if default_role is not None:
+            body["defaultRole"] = default_role
+
+        return await self._post(f"projects/{project_id}/models", json=body)
+
+    async def start_export_ifc(self, project_id: str, model_id: str) -> Dict[str, Any]:
+        return await self._post(f"projects/{project_id}/models/{model_id}/export-ifc")
+
+    async def get_export_ifc_result_url(self, project_id: str, model_id: str, operation_id: str) -> str:
+        return await self._redirect_location(f"projects/{project_id}/models/{model_id}/export-ifc/{operation_id}/result")
+
+    async def list_codification_libraries(self, project_id: str) -> List[Dict[str, Any]]:
+        data = await self.get(f"projects/{project_id}/codifications")
+        return data.get("codificationLibraries", []) if isinstance(data, dict) else []
+
+    async def create_codification_library(self, project_id: str, library_properties: Dict[str, Any]) -> Dict[str, Any]:
+        result = await self._post(f"projects/{project_id}/codifications", json=library_properties)
+        return result if isinstance(result, dict) else {}
+
+    async def get_codification_library(self, project_id: str, library_guid: str) -> Dict[str, Any]:
+        data = await self.get(f"projects/{project_id}/codifications/{library_guid}")
+        return data if isinstance(data, dict) else {}
+
+    async def delete_codification_library(self, project_id: str, library_guid: str) -> None:
+        await self._delete(f"projects/{project_id}/codifications/{library_guid}")
+
+    async def create_classification_code(self, project_id: str, library_guid: str, code: Dict[str, Any]) -> Dict[str, Any]:
+        result = await self._post(f"projects/{project_id}/codifications/{library_guid}/codification", json=code)
+        return result if isinstance(result, dict) else {}
+
+    async def update_classification_code(self, project_id: str, library_guid: str, codification_guid: str,
+                                         changes: Dict[str, Any]) -> None:
+        await self._put(f"projects/{project_id}/codifications/{library_guid}/codification/{codification_guid}",
+                        json=changes)
+
+    async def delete_classification_code(self, project_id: str, library_guid: str, codification_guid: str) -> None:
+        await self._delete(f"projects/{project_id}/codifications/{library_guid}/codification/{codification_guid}")
+
+    async def get_custom_properties(self, project_id: str) -> Dict[str, Any]:
+        data = await self.get(f"projects/{project_id}/customProperties")
+        return data if isinstance(data, dict) else {}
+
+    async def create_property_set(self, project_id: str, property_set: Dict[str, Any]) -> Dict[str, Any]:
+        result = await self._post(f"projects/{project_id}/customProperties/property-sets", json=property_set)
+        return result if isinstance(result, dict) else {}
+
+    async def update_property_set(self, project_id: str, property_set_id: int | str, changes: Dict[str, Any]) -> None:
+        await self._put(f"projects/{project_id}/customProperties/property-sets/{property_set_id}", json=changes)
+
+    async def delete_property_set(self, project_id: str, property_set_id: int | str) -> None:
+        await self._delete(f"projects/{project_id}/customProperties/property-sets/{property_set_id}")
+
+    async def add_property_definition(self, project_id: str, property_set_id: int | str,
+                                      definition: Dict[str, Any]) -> Dict[str, Any]:
+        result = await self._post(f"projects/{project_id}/customProperties/property-sets/{property_set_id}/property",
+                                  json=definition)
+        return result if isinstance(result, dict) else {}
+
+    async def update_property_definition(self, project_id: str, property_set_id: int | str,
+                                         property_definition_id: int | str, changes: Dict[str, Any]) -> Dict[str, Any]:
+        result = await self._put(
+            f"projects/{project_id}/customProperties/property-sets/{property_set_id}/property/{property_definition_id}",
+            json=changes)
+        return result if isinstance(result, dict) else {}
+
+    async def delete_property_definition(self, project_id: str, property_set_id: int | str,
+                                         property_definition_id: int | str) -> None:
+        await self._delete(
+            f"projects/{project_id}/customProperties/property-sets/{property_set_id}/property/{property_definition_id}")
+
+    async def get_material_overview(self, project_id: str) -> Dict[str, Any]:
+        data = await self.get(f"projects/{project_id}/material-libraries")
+        return data if isinstance(data, dict) else {}
+
+    async def get_material_library(self, project_id: str, library_guid: str) -> Dict[str, Any]:
+        data = await self.get(f"projects/{project_id}/material-libraries/{library_guid}")
+        return data if isinstance(data, dict) else {}
+
+    async def create_material(self, project_id: str, library_guid: str, material: Dict[str, Any]) -> Dict[str, Any]:
+        result = await self._post(f"projects/{project_id}/material-libraries/{library_guid}/materials", json=material)
+        return result if isinstance(result, dict) else {}
+
+    async def update_material(self, project_id: str, library_guid: str, material_guid: str,
+                              material: Dict[str, Any]) -> None:
+        await self._put(f"projects/{project_id}/material-libraries/{library_guid}/materials/{material_guid}",
+                        json=material)
+
+    async def delete_material(self, project_id: str, library_guid: str, material_guid: str) -> None:
+        await self._delete(f"projects/{project_id}/material-libraries/{library_guid}/materials/{material_guid}")
+
+    async def create_material_library(self, project_id: str, library_properties: Dict[str, Any]) -> Dict[str, Any]:
+        result = await self._post(f"projects/{project_id}/material-libraries", json=library_properties)
+        return result if isinstance(result, dict) else {}
+
+    async def delete_material_library(self, project_id: str, library_guid: str) -> None:
+        await self._delete(f"projects/{project_id}/material-libraries/{library_guid}")
+
+    async def get_locations(self, project_id: str) -> List[Dict[str, Any]]:
+        data = await self.get(f"projects/{project_id}/locations")
+        if isinstance(data, dict):
+            return data.get("locationViews", [])
+        return []
+
+    async def create_location(self, project_id: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+        result = await self._post(f"projects/{project_id}/locations", json=properties)
+        return result if isinstance(result, dict) else {}
+
+    async def update_location(self, project_id: str, location_guid: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+        result = await self._put(f"projects/{project_id}/locations/{location_guid}", json=properties)
+        return result if isinstance(result, dict) else {}
+
+    async def delete_location(self, project_id: str, location_guid: str) -> None:
+        await self._delete(f"projects/{project_id}/locations/{location_guid}")
+
+    async def get_types(self, project_id: str) -> Dict[str, Any]:
+        data = await self.get(f"projects/{project_id}/types")
+        return data if isinstance(data, dict) else {}
+
+    async def create_type(self, project_id: str, library_guid: str, type_item: Dict[str, Any]) -> Dict[str, Any]:
+        result = await self._post(f"projects/{project_id}/types/{library_guid}", json=type_item)
+        return result if isinstance(result, dict) else {}
+
+    async def update_type(self, project_id: str, library_guid: str, type_guid: str, changes: Dict[str, Any]) -> None:
+        await self._put(f"projects/{project_id}/types/{library_guid}/types/{type_guid}", json=changes)
+
+    async def delete_type(self, project_id: str, library_guid: str, type_guid: str) -> None:
+        await self._delete(f"projects/{project_id}/types/{library_guid}/types/{type_guid}")
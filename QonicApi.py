@@ -1,28 +1,76 @@
+import copy
 import os
+import time
 import uuid
-from typing import Dict, List, Optional, Any, Iterable
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Iterable, Iterator, Callable, Mapping, Set, Tuple
 import requests
 
 from QonicApiLib import QonicApiError, ModificationInputError, ProductFilter
-from oauth import login
+from bulkDelete import DELETED, FAILED, NOT_FOUND, BulkDeleteResult
+from httpCache import CachePolicy, ResponseCache, ValidatorCache
+from instrumentation import Instrumentation
+from jsonCodec import JsonCodec, get_codec
+from jsonStream import iter_json_array
+from modelCache import ModelCache, model_revision, request_hash
+from modelSession import ModelSession
+from oauth import default_token_store, get_token, load_env, refresh
+from prefetch import prefetch
+from rateLimiter import AdaptiveLimiter, THROTTLE_STATUSES, parse_retry_after, retryable
+from sharding import Shard, ShardedResult, merge_shards, plan_shards
+from singleFlight import SingleFlight
+from tokenManager import TokenManager
+from transport import Transport, accept_encoding
+
+if TYPE_CHECKING:
+    from productTable import ProductTable
+    from tokenStore import TokenStore
 
 class QonicApi:
-    def __init__(self):
+    def __init__(self, transport: Transport | None = None, limiter: AdaptiveLimiter | None = None,
+                 codec: JsonCodec | None = None, cache_policies: Mapping[str, CachePolicy] | None = None,
+                 model_cache: ModelCache | None = None, instrumentation: Instrumentation | None = None,
+                 token_store: "TokenStore | None" = None):
+        load_env()
         self.base_url = os.getenv("QONIC_API_URL", "https://api.qonic.com/v1/").rstrip("/") + "/"
-        self.session = requests.Session()
+        self.codec = codec or get_codec()
+        self.transport = transport or Transport()
+        self.limiter = limiter or AdaptiveLimiter()
+        self.validators = ValidatorCache()
+        self.cache = ResponseCache(cache_policies)
+        self.model_cache = model_cache
+        self.single_flight = SingleFlight()
+        self.instrumentation = instrumentation or Instrumentation()
+        self.change_listeners: List[Callable[[str, str, str, Any], None]] = []
+        self.token_store = token_store
+        self.tokens = TokenManager(refresh, token_store)
+        self.session = self.transport.api_session
         self.session_id = self.new_session_id()
-        self.access_token = None
+        # Models this client edited in its session and has not published or discarded yet
+        self.pending_edits: Set[Tuple[str, str]] = set()
+
+    @property
+    def access_token(self) -> Optional[str]:
+        return self.tokens.access_token
+
+    @access_token.setter
+    def access_token(self, value: str) -> None:
+        self.tokens.set({"access_token": value})
 
     def _url(self, path: str) -> str:
         path = path.lstrip("/")
         return self.base_url + path
 
     def _headers(self) -> Dict[str, str]:
-        return {
-            "Authorization": f"Bearer {self.access_token}",
+        headers = {
             "Accept": "application/json",
             "X-Client-Session-Id": self.session_id
         }
+        # A single attribute read: the renewal thread swaps the whole header value at once
+        authorization = self.tokens.authorization
+        if authorization:
+            headers["Authorization"] = authorization
+        return headers
 
     def _request(
             self,
@@ -32,64 +80,199 @@ class QonicApi:
             params: Dict[str, Any] | None = None,
             json: Any = None,
             data: Any = None,
+            headers: Dict[str, str] | None = None,
             allow_redirects: bool = True,
+            stream: bool = False,
     ) -> requests.Response:
         url = self._url(path)
-        resp = self.session.request(
-            method,
-            url,
-            params=params,
-            json=json,
-            data=data,
-            headers=self._headers(),
-            allow_redirects=allow_redirects,
-        )
-        if not resp.ok:
-            raise QonicApiError(resp)
-        return resp
-
-    def get(self, path: str, **kwargs) -> Any:
-        resp = self._request("GET", path, **kwargs)
-        return resp.json()
-
-    def _post(self, path: str, **kwargs) -> Any:
-        resp = self._request("POST", path, **kwargs)
+        request_headers = self._headers()
+        if json is not None:
+            # Encode once up front so retries resend the same bytes and requests does not re-encode
+            data = self.codec.dumps(json)
+            request_headers["Content-Type"] = "application/json"
+        if headers:
+            request_headers.update(headers)
+        request_bytes = len(data) if isinstance(data, (bytes, str)) else 0
+        attempt = 0
+        reauthorized = False
+        while True:
+            throttled = False
+            retry_after = None
+            # Picked up per attempt, so a retry after a background renewal sends the new token
+            authorization = self.tokens.authorization
+            if authorization and not (headers and "Authorization" in headers):
+                request_headers["Authorization"] = authorization
+            self.limiter.acquire()
+            record = self.instrumentation.start(method, path, request_bytes, attempt)
+            try:
+                resp = self.transport.request(
+                    method,
+                    url,
+                    params=params,
+                    data=data,
+                    headers=request_headers,
+                    allow_redirects=allow_redirects,
+                    stream=stream,
+                )
+            except BaseException as e:
+                self.limiter.release()
+                self.instrumentation.finish(record, error=e)
+                raise
+            try:
+                response_bytes = int(resp.headers.get("Content-Length") or 0) if stream else len(resp.content)
+                self.instrumentation.finish(record, resp.status_code, response_bytes)
+                throttled = resp.status_code in THROTTLE_STATUSES
+                if throttled:
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    resp.close()
+            finally:
+                self.limiter.release(throttled=throttled, retry_after=retry_after)
+
+            if throttled and attempt < self.limiter.max_retries and retryable(method, resp.status_code, retry_after):
+                time.sleep(self.limiter.backoff(attempt, retry_after))
+                attempt += 1
+                continue
+            # Safety net for tokens that expire early (clock skew, revocation): renew once and resend
+            if resp.status_code == 401 and not reauthorized and self.tokens.renew_now(authorization):
+                resp.close()
+                reauthorized = True
+                continue
+            if not resp.ok:
+                raise QonicApiError(resp)
+            return resp
+
+    def _loads(self, method: str, path: str, resp: requests.Response) -> Any:
+        started = time.perf_counter()
+        try:
+            return self.codec.loads(resp.content)
+        finally:
+            self.instrumentation.record_decode(method, path, time.perf_counter() - started)
+
+    def _decode(self, method: str, path: str, resp: requests.Response) -> Any:
         if resp.content:
             try:
-                return resp.json()
+                return self._loads(method, path, resp)
             except ValueError:
                 return resp.text
         return None
 
+    def get(self, path: str, params: Dict[str, Any] | None = None, **kwargs) -> Any:
+        if kwargs:
+            return self._loads("GET", path, self._request("GET", path, params=params, **kwargs))
+        # Identical reads that are already in flight share that call and its decoded result
+        key = ("GET", self.session_id, ValidatorCache.key(self._url(path), params))
+        return self.single_flight.do(key, lambda: self._loads("GET", path, self._request("GET", path, params=params)))
+
+    def _conditional_get(self, path: str, params: Dict[str, Any] | None = None) -> Any:
+        key = ValidatorCache.key(self._url(path), params)
+        return self.single_flight.do(("conditional", self.session_id, key),
+                                     lambda: self._validated_get(key, path, params))
+
+    def _validated_get(self, key: str, path: str, params: Dict[str, Any] | None) -> Any:
+        # The decoded body of a 304 is shared between callers, so treat it as read-only
+        cached = self.validators.get(key)
+        resp = self._request("GET", path, params=params, headers=cached.request_headers() if cached else None)
+        if resp.status_code == 304 and cached is not None:
+            self.validators.record(hit=True)
+            return cached.body
+        self.validators.record(hit=False)
+        body = self._loads("GET", path, resp)
+        self.validators.store(key, resp.headers, body)
+        return body
+
+    def _post(self, path: str, **kwargs) -> Any:
+        return self._decode("POST", path, self._request("POST", path, **kwargs))
+
     def _delete(self, path: str, **kwargs) -> Any:
-        resp = self._request("DELETE", path, **kwargs)
-        if resp.content:
-            try:
-                return resp.json()
-            except ValueError:
-                return resp.text
-        return None
+        return self._decode("DELETE", path, self._request("DELETE", path, **kwargs))
 
     def _put(self, path: str, **kwargs) -> Any:
-        resp = self._request("PUT", path, **kwargs)
-        if resp.content:
-            try:
-                return resp.json()
-            except ValueError:
-                return resp.text
+        return self._decode("PUT", path, self._request("PUT", path, **kwargs))
+
+    def _cached(self, family: str, key: tuple, load: Callable[[], Any], sizes: List[int] | None = None) -> Any:
+        # load() appends the encoded size of what it returns to sizes, for families bounded by bytes
+        hit, value = self.cache.get(family, key)
+        if hit:
+            return value
+        value = load()
+        self.cache.put(family, key, value, sum(sizes) if sizes else 0)
+        return value
+
+    def _model_revision(self, project_id: str, model_id: str) -> Optional[str]:
+        for model in self.list_models(project_id):
+            if str(model.get("id")) == str(model_id):
+                return model_revision(model)
         return None
 
+    def _scope(self, project_id: str, model_id: str) -> Optional[str]:
+        # While the session has unpublished edits, the server answers with that session's view of the model, so
+        # those results are cached apart from what other sessions and the published model see
+        return self.session_id if (project_id, model_id) in self.pending_edits else None
+
+    def _disk_cached(self, project_id: str, model_id: str, kind: str, request: bytes, load: Callable[[], Any],
+                     sizes: List[int] | None = None) -> Any:
+        # The model revision only changes on publish, so unpublished edits never go to the disk cache
+        if self.model_cache is None or (project_id, model_id) in self.pending_edits:
+            return load()
+        revision = self._model_revision(project_id, model_id)
+        if revision is None:
+            return load()
+        key = request_hash(request)
+        cached = self.model_cache.get(project_id, model_id, revision, kind, key)
+        if cached is not None:
+            if sizes is not None:
+                sizes.append(len(cached))
+            return self.codec.loads(cached)
+        value = load()
+        self.model_cache.put(project_id, model_id, revision, kind, key, self.codec.dumps(value))
+        return value
+
+    def add_change_listener(self, listener: Callable[[str, str, str, Any], None]) -> None:
+        # Called as listener(event, project_id, model_id, payload) after modify, delete, publish and discard
+        self.change_listeners.append(listener)
+
+    def remove_change_listener(self, listener: Callable[[str, str, str, Any], None]) -> None:
+        self.change_listeners.remove(listener)
+
+    def _notify(self, event: str, project_id: str, model_id: str, payload: Any = None) -> None:
+        for listener in list(self.change_listeners):
+            listener(event, project_id, model_id, payload)
+
+    def _invalidate_model(self, project_id: str, model_id: str) -> None:
+        self.cache.invalidate("products", project_id, model_id)
+        self.cache.invalidate("product_fields", project_id, model_id)
+        if self.model_cache is not None:
+            self.model_cache.invalidate(project_id, model_id)
+
+    def _invalidate_custom_properties(self, project_id: str) -> None:
+        # Property definitions change the available fields of every model in the project, and the ModelCache
+        # entries stay under the same model revision, so they are dropped as well
+        self.cache.invalidate("custom_properties", project_id)
+        self.cache.invalidate("product_fields", project_id)
+        if self.model_cache is not None:
+            self.model_cache.invalidate(project_id)
+
     def authorize(self):
-        self.access_token = login()["access_token"]
+        self.token_store = self.token_store or default_token_store()
+        self.tokens.store = self.token_store
+        self.tokens.set(get_token(self.token_store))
+
+    def close(self):
+        self.tokens.close()
+        self.transport.close()
 
     def list_projects(self) -> List[Any]:
-        return self.get("projects").get("projects", [])
+        return self._cached("projects", (), lambda: self._conditional_get("projects").get("projects", []))
 
     def list_models(self, project_id: str) -> List[Any]:
-        return self.get(f"projects/{project_id}/models").get("models", [])
+        return self._cached("models", (project_id,),
+                            lambda: self._conditional_get(f"projects/{project_id}/models").get("models", []))
 
     def get_available_product_fields(self, project_id: str, model_id: str) -> List[str]:
-        return self.get(f"projects/{project_id}/models/{model_id}/products/properties/available-data").get("fields", [])
+        path = f"projects/{project_id}/models/{model_id}/products/properties/available-data"
+        return self._cached(
+            "product_fields", (project_id, model_id, self._scope(project_id, model_id)),
+            lambda: self._disk_cached(project_id, model_id, "fields", b"", lambda: self.get(path).get("fields", [])))
 
     def query_products(
             self,
@@ -102,7 +285,144 @@ class QonicApi:
             "fields": list(fields),
             "filters": filters or {},
         }
-        return self._post(f"projects/{project_id}/models/{model_id}/products/properties/query", json=body).get("result", {})
+        path = f"projects/{project_id}/models/{model_id}/products/properties/query"
+        request = self.codec.dumps(body)
+        sizes: List[int] = []
+
+        def fetch() -> Any:
+            resp = self._request("POST", path, json=body)
+            sizes.append(len(resp.content))
+            return self._decode("POST", path, resp).get("result", {})
+
+        # The result is shared with later cache hits, so treat it as read-only
+        return self._cached(
+            "products", (project_id, model_id, request, self._scope(project_id, model_id)),
+            lambda: self._disk_cached(project_id, model_id, "products", request, fetch, sizes), sizes)
+
+    def query_products_stream(
+            self,
+            project_id: str,
+            model_id: str,
+            fields: Iterable[str],
+            filters: Iterable[ProductFilter] | None = None,
+            chunk_size: int = 64 * 1024,
+    ) -> Iterator[Dict[str, Any]]:
+        body = {
+            "fields": list(fields),
+            "filters": filters or {},
+        }
+        resp = self._request(
+            "POST",
+            f"projects/{project_id}/models/{model_id}/products/properties/query",
+            json=body,
+            headers={"Accept-Encoding": accept_encoding()},
+            stream=True,
+        )
+        with resp:
+            yield from iter_json_array(resp.iter_content(chunk_size=chunk_size), "result")
+
+    def query_products_iter(
+            self,
+            project_id: str,
+            model_id: str,
+            fields: Iterable[str],
+            filters: Iterable[ProductFilter] | None = None,
+            page_size: int = 1000,
+            prefetch_pages: int = 2,
+    ) -> Iterator[Dict[str, Any]]:
+        # The query endpoint cannot page, so the matching GUIDs are listed first (streamed, one short
+        # string per product) and the full rows are then fetched in pages with a Guid In filter.
+        filters = list(filters or [])
+        guids = [row["Guid"] for row in self.query_products_stream(project_id, model_id, ["Guid"], filters)]
+        yield from self.query_products_by_guid(project_id, model_id, fields, guids, filters, page_size, prefetch_pages)
+
+    def query_products_by_guid(
+            self,
+            project_id: str,
+            model_id: str,
+            fields: Iterable[str],
+            guids: Iterable[str],
+            filters: Iterable[ProductFilter] | None = None,
+            page_size: int = 1000,
+            prefetch_pages: int = 2,
+    ) -> Iterator[Dict[str, Any]]:
+        fields = list(fields)
+        filters = list(filters or [])
+        guids = list(guids)
+        path = f"projects/{project_id}/models/{model_id}/products/properties/query"
+
+        def page(guids: List[str]) -> Callable[[], List[Dict[str, Any]]]:
+            body = {
+                "fields": fields,
+                "filters": filters + [{"property": "Guid", "value": guids, "operator": "In"}],
+            }
+            return lambda: self._post(path, json=body).get("result", [])
+
+        pages = (page(guids[i:i + page_size]) for i in range(0, len(guids), page_size))
+        for rows in prefetch(pages, prefetch_pages):
+            yield from rows
+
+    def query_products_sharded(
+            self,
+            project_id: str,
+            model_id: str,
+            fields: Iterable[str],
+            filters: Iterable[ProductFilter] | None = None,
+            shards: int = 4,
+            shard_by: str = "Class",
+            partitions: List[List[ProductFilter]] | None = None,
+            max_workers: int | None = None,
+    ) -> ShardedResult:
+        started = time.perf_counter()
+        fields = list(fields)
+        if "Guid" not in fields:
+            fields.insert(0, "Guid")
+        filters = list(filters or [])
+        counts: Dict[Any, int] = {}
+        if partitions is None:
+            # Facet pass: stream only the shard_by column to learn its values and how many products each has
+            values = (row.get(shard_by) for row in self.query_products_stream(project_id, model_id, [shard_by], filters))
+            counts = Counter(v.get("Value") if isinstance(v, dict) else v for v in values)
+            partitions = plan_shards(counts, shards, shard_by)
+        plan = [Shard(i, filters + p, sum(counts.get(v, 0) for v in p[0]["value"]) if counts else None)
+                for i, p in enumerate(partitions)]
+        plan_seconds = time.perf_counter() - started
+        path = f"projects/{project_id}/models/{model_id}/products/properties/query"
+
+        def run(shard: Shard) -> List[Dict[str, Any]]:
+            shard_started = time.perf_counter()
+            try:
+                return self._post(path, json={"fields": fields, "filters": shard.filters}).get("result", [])
+            except BaseException as e:
+                shard.error = e
+                raise
+            finally:
+                shard.seconds = time.perf_counter() - shard_started
+
+        if not plan:
+            return ShardedResult([], plan, plan_seconds, time.perf_counter() - started)
+        # Imported on use, like productTable: concurrent.futures adds to the import time of every client
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(plan), thread_name_prefix="qonic-shard") as pool:
+            results = list(pool.map(run, plan))
+        rows = merge_shards(results, plan)
+        return ShardedResult(rows, plan, plan_seconds, time.perf_counter() - started)
+
+    def query_products_table(
+            self,
+            project_id: str,
+            model_id: str,
+            fields: Iterable[str],
+            filters: Iterable[ProductFilter] | None = None,
+            page_size: int = 1000,
+    ) -> "ProductTable":
+        # Imported on use: NumPy, when installed, is a heavy import the other calls do not need
+        from productTable import ProductTable
+
+        fields = list(fields)
+        rows = self.query_products_iter(project_id, model_id, fields, filters, page_size=page_size)
+        return ProductTable.from_rows(rows, fields)
 
     def calculate_quantities(self, project_id: str, model_id: str, calculators: Iterable[str],
                              filters: Iterable[ProductFilter] | None = None) -> Dict[str, Any]:
@@ -130,12 +450,28 @@ class QonicApi:
     def new_session_id() -> str:
         return str(uuid.uuid4())
 
-    def start_session(self, project_id: str, model_id: str) -> None:
-        self.session_id = self.new_session_id()
+    def start_session(self, project_id: str, model_id: str, session_id: Optional[str] = None) -> None:
+        # Replaces the session id of this client; use model_session() to edit several models from threads
+        self.session_id = session_id or self.new_session_id()
         self._post(f"projects/{project_id}/models/{model_id}/start-session")
 
     def end_session(self, project_id: str, model_id: str) -> None:
         self._post(f"projects/{project_id}/models/{model_id}/end-session")
+        if (project_id, model_id) in self.pending_edits:
+            # Ending the session does not publish: the edits stay pending until publish_changes or
+            # discard_changes, so later results are still kept out of the shared and disk caches
+            self._invalidate_model(project_id, model_id)
+
+    def session_client(self, session_id: Optional[str] = None) -> "QonicApi":
+        # A shallow copy that shares the transport, caches, limiter, tokens and change listeners with this
+        # client; only its X-Client-Session-Id and pending edits are its own. Close the original client, not the copy.
+        client = copy.copy(self)
+        client.session_id = session_id or self.new_session_id()
+        client.pending_edits = set()
+        return client
+
+    def model_session(self, project_id: str, model_id: str) -> ModelSession:
+        return ModelSession(self.session_client(), project_id, model_id)
 
     def modify_products(self, project_id: str, model_id: str, changes: Dict[str, Any]) -> List[ModificationInputError]:
         result = self._post(
@@ -143,11 +479,70 @@ class QonicApi:
             json=changes,
 
         )
+        self.pending_edits.add((project_id, model_id))
+        self._invalidate_model(project_id, model_id)
+        self._notify("modify", project_id, model_id, changes)
         errors_json = result.get("errors", []) if isinstance(result, dict) else []
         return [ModificationInputError(**e) for e in errors_json]
 
     def delete_product(self, project_id: str, model_id: str, guid: str) -> None:
         self._delete(f"projects/{project_id}/models/{model_id}/products/{guid}")
+        self.pending_edits.add((project_id, model_id))
+        self._invalidate_model(project_id, model_id)
+        self._notify("delete", project_id, model_id, guid)
+
+    def delete_products(
+            self,
+            project_id: str,
+            model_id: str,
+            guids: Iterable[str] | None = None,
+            filters: Iterable[ProductFilter] | None = None,
+            max_workers: int = 8,
+            progress: Callable[[BulkDeleteResult], None] | None = None,
+            all_products: bool = False,
+    ) -> BulkDeleteResult:
+        # The API has no batch delete for products, so the per-GUID DELETEs are pipelined over the shared
+        # connection pool. Like delete_product, call it inside a modification session.
+        filters = None if filters is None else list(filters)
+        if guids is None and not filters and not all_products:
+            # Without guids, an empty filter list matches every product of the model
+            raise ValueError("delete_products needs guids or non-empty filters; pass all_products=True to delete "
+                             "every product of the model")
+        if guids is None or filters is not None:
+            matching = (self.query_products_stream(project_id, model_id, ["Guid"], filters) if guids is None
+                        else self.query_products_by_guid(project_id, model_id, ["Guid"], guids, filters))
+            guids = (row["Guid"] for row in matching)
+        guids = list(dict.fromkeys(guids))
+        result = BulkDeleteResult(len(guids))
+
+        def run(guid: str) -> None:
+            try:
+                self._delete(f"projects/{project_id}/models/{model_id}/products/{guid}")
+            except QonicApiError as e:
+                if e.response.status_code == 404:
+                    result.record(guid, NOT_FOUND)
+                else:
+                    result.record(guid, FAILED, e)
+            except Exception as e:
+                result.record(guid, FAILED, e)
+            else:
+                result.record(guid, DELETED)
+                self._notify("delete", project_id, model_id, guid)
+            if progress is not None:
+                # Called from the worker threads
+                progress(result)
+
+        try:
+            if guids:
+                from concurrent.futures import ThreadPoolExecutor
+
+                with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="qonic-delete") as pool:
+                    list(pool.map(run, guids))
+        finally:
+            if result.counts()[DELETED]:
+                self.pending_edits.add((project_id, model_id))
+            self._invalidate_model(project_id, model_id)
+        return result
 
     def publish_changes(self, project_id: str, model_id: str, title: Optional[str] = None, description: Optional[str] = None) -> None:
         body = {
@@ -155,9 +550,16 @@ class QonicApi:
             "description": description,
         }
         self._post(f"projects/{project_id}/models/{model_id}/publish", json=body)
+        self.pending_edits.discard((project_id, model_id))
+        self._invalidate_model(project_id, model_id)
+        self.cache.invalidate("models", project_id)
+        self._notify("publish", project_id, model_id)
 
     def discard_changes(self, project_id: str, model_id: str) -> None:
         self._post(f"projects/{project_id}/models/{model_id}/discard")
+        self.pending_edits.discard((project_id, model_id))
+        self._invalidate_model(project_id, model_id)
+        self._notify("discard", project_id, model_id)
 
     def get_upload_url(self) -> str:
         data = self.get("upload-url")
@@ -183,7 +585,9 @@ class QonicApi:
         if default_role is not None:
             body["defaultRole"] = default_role
 
-        return self._post(f"projects/{project_id}/models", json=body)
+        result = self._post(f"projects/{project_id}/models", json=body)
+        self.cache.invalidate("models", project_id)
+        return result
 
     def start_export_ifc(self, project_id: str, model_id: str) -> Dict[str, Any]:
         return self._post(f"projects/{project_id}/models/{model_id}/export-ifc")
@@ -200,49 +604,61 @@ class QonicApi:
         return location
 
     def list_codification_libraries(self, project_id: str) -> List[Dict[str, Any]]:
-        data = self.get(f"projects/{project_id}/codifications")
+        data = self._cached("codifications", (project_id,),
+                            lambda: self._conditional_get(f"projects/{project_id}/codifications"))
         return data.get("codificationLibraries", []) if isinstance(data, dict) else []
 
     def create_codification_library(self, project_id: str, library_properties: Dict[str, Any]) -> Dict[str, Any]:
         result = self._post(f"projects/{project_id}/codifications", json=library_properties)
+        self.cache.invalidate("codifications", project_id)
         return result if isinstance(result, dict) else {}
 
     def get_codification_library(self, project_id: str, library_guid: str) -> Dict[str, Any]:
-        data = self.get(f"projects/{project_id}/codifications/{library_guid}")
+        data = self._cached("codifications", (project_id, library_guid),
+                            lambda: self.get(f"projects/{project_id}/codifications/{library_guid}"))
         return data if isinstance(data, dict) else {}
 
     def delete_codification_library(self, project_id: str, library_guid: str) -> None:
         self._delete(f"projects/{project_id}/codifications/{library_guid}")
+        self.cache.invalidate("codifications", project_id)
 
     def create_classification_code(self, project_id: str, library_guid: str, code: Dict[str, Any]) -> Dict[str, Any]:
         result = self._post(f"projects/{project_id}/codifications/{library_guid}/codification", json=code)
+        self.cache.invalidate("codifications", project_id)
         return result if isinstance(result, dict) else {}
 
     def update_classification_code(self, project_id: str, library_guid: str, codification_guid: str,
                                    changes: Dict[str, Any]) -> None:
         self._put(f"projects/{project_id}/codifications/{library_guid}/codification/{codification_guid}",
                   json=changes, )
+        self.cache.invalidate("codifications", project_id)
 
     def delete_classification_code(self, project_id: str, library_guid: str, codification_guid: str) -> None:
         self._delete(f"projects/{project_id}/codifications/{library_guid}/codification/{codification_guid}")
+        self.cache.invalidate("codifications", project_id)
 
     def get_custom_properties(self, project_id: str) -> Dict[str, Any]:
-        data = self.get(f"projects/{project_id}/customProperties")
+        data = self._cached("custom_properties", (project_id,),
+                            lambda: self._conditional_get(f"projects/{project_id}/customProperties"))
         return data if isinstance(data, dict) else {}
 
     def create_property_set(self, project_id: str, property_set: Dict[str, Any]) -> Dict[str, Any]:
         result = self._post(f"projects/{project_id}/customProperties/property-sets", json=property_set)
+        self._invalidate_custom_properties(project_id)
         return result if isinstance(result, dict) else {}
 
     def update_property_set(self, project_id: str, property_set_id: int | str, changes: Dict[str, Any]) -> None:
         self._put(f"projects/{project_id}/customProperties/property-sets/{property_set_id}", json=changes)
+        self._invalidate_custom_properties(project_id)
 
     def delete_property_set(self, project_id: str, property_set_id: int | str) -> None:
         self._delete(f"projects/{project_id}/customProperties/property-sets/{property_set_id}")
+        self._invalidate_custom_properties(project_id)
 
     def add_property_definition(self, project_id: str, property_set_id: int | str, definition: Dict[str, Any]) -> Dict[str, Any]:
         result = self._post(f"projects/{project_id}/customProperties/property-sets/{property_set_id}/property",
                             json=definition)
+        self._invalidate_custom_properties(project_id)
         return result if isinstance(result, dict) else {}
 
     def update_property_definition(self, project_id: str, property_set_id: int | str, property_definition_id: int | str,
@@ -250,66 +666,82 @@ class QonicApi:
         result = self._put(
             f"projects/{project_id}/customProperties/property-sets/{property_set_id}/property/{property_definition_id}",
             json=changes)
+        self._invalidate_custom_properties(project_id)
         return result if isinstance(result, dict) else {}
 
     def delete_property_definition(self, project_id: str, property_set_id: int | str,
                                    property_definition_id: int | str) -> None:
         self._delete(
             f"projects/{project_id}/customProperties/property-sets/{property_set_id}/property/{property_definition_id}")
+        self._invalidate_custom_properties(project_id)
 
     def get_material_overview(self, project_id: str) -> Dict[str, Any]:
-        data = self.get(f"projects/{project_id}/material-libraries")
+        data = self._cached("materials", (project_id,),
+                            lambda: self._conditional_get(f"projects/{project_id}/material-libraries"))
         return data if isinstance(data, dict) else {}
 
     def get_material_library(self, project_id: str, library_guid: str) -> Dict[str, Any]:
-        data = self.get(f"projects/{project_id}/material-libraries/{library_guid}")
+        data = self._cached("materials", (project_id, library_guid),
+                            lambda: self.get(f"projects/{project_id}/material-libraries/{library_guid}"))
         return data if isinstance(data, dict) else {}
 
     def create_material(self, project_id: str, library_guid: str, material: Dict[str, Any], ) -> Dict[str, Any]:
         result = self._post(f"projects/{project_id}/material-libraries/{library_guid}/materials", json=material)
+        self.cache.invalidate("materials", project_id)
         return result if isinstance(result, dict) else {}
 
     def update_material(self, project_id: str, library_guid: str, material_guid: str, material: Dict[str, Any], ) -> None:
         self._put(f"projects/{project_id}/material-libraries/{library_guid}/materials/{material_guid}", json=material)
+        self.cache.invalidate("materials", project_id)
 
     def delete_material(self, project_id: str, library_guid: str, material_guid: str) -> None:
         self._delete(f"projects/{project_id}/material-libraries/{library_guid}/materials/{material_guid}")
+        self.cache.invalidate("materials", project_id)
 
     def create_material_library(self, project_id: str, library_properties: Dict[str, Any]) -> Dict[str, Any]:
         result = self._post(f"projects/{project_id}/material-libraries", json=library_properties)
+        self.cache.invalidate("materials", project_id)
         return result if isinstance(result, dict) else {}
 
     def delete_material_library(self, project_id: str, library_guid: str) -> None:
         self._delete(f"projects/{project_id}/material-libraries/{library_guid}")
+        self.cache.invalidate("materials", project_id)
 
     def get_locations(self, project_id: str) -> List[Dict[str, Any]]:
-        data = self.get(f"projects/{project_id}/locations")
+        data = self._cached("locations", (project_id,),
+                            lambda: self._conditional_get(f"projects/{project_id}/locations"))
         if isinstance(data, dict):
             return data.get("locationViews", [])
         return []
 
     def create_location(self, project_id: str, properties: Dict[str, Any]) -> Dict[str, Any]:
         result = self._post(f"projects/{project_id}/locations", json=properties)
+        self.cache.invalidate("locations", project_id)
         return result if isinstance(result, dict) else {}
 
     def update_location(self, project_id: str, location_guid: str, properties: Dict[str, Any]) -> Dict[str, Any]:
         result = self._put(f"projects/{project_id}/locations/{location_guid}", json=properties)
+        self.cache.invalidate("locations", project_id)
         return result if isinstance(result, dict) else {}
 
     def delete_location(self, project_id: str, location_guid: str) -> None:
         self._delete(f"projects/{project_id}/locations/{location_guid}")
+        self.cache.invalidate("locations", project_id)
 
     def get_types(self, project_id: str) -> Dict[str, Any]:
-        data = self.get(f"projects/{project_id}/types")
+        data = self._cached("types", (project_id,), lambda: self._conditional_get(f"projects/{project_id}/types"))
         return data if isinstance(data, dict) else {}
 
     def create_type(self, project_id: str, library_guid: str, type_item: Dict[str, Any]) -> Dict[str, Any]:
         result = self._post(f"projects/{project_id}/types/{library_guid}", json=type_item)
+        self.cache.invalidate("types", project_id)
         return result if isinstance(result, dict) else {}
 
     def update_type(self, project_id: str, library_guid: str, type_guid: str, changes: Dict[str, Any]) -> None:
         self._put(f"projects/{project_id}/types/{library_guid}/types/{type_guid}", json=changes)
+        self.cache.invalidate("types", project_id)
 
     def delete_type(self, project_id: str, library_guid: str, type_guid: str) -> None:
         self._delete(f"projects/{project_id}/types/{library_guid}/types/{type_guid}")
+        self.cache.invalidate("types", project_id)
 
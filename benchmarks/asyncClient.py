@@ -0,0 +1,49 @@
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.stubServer import StubServer, StubState
+
+
+def run_sync(projects) -> int:
+    from QonicApi import QonicApi
+    api = QonicApi()
+    api.access_token = "benchmark"
+    return sum(len(api.list_models(p["id"])) for p in projects)
+
+
+async def run_async(projects, limit_per_host: int) -> int:
+    from AsyncQonicApi import AsyncQonicApi
+    async with AsyncQonicApi(limit_per_host=limit_per_host, access_token="benchmark") as api:
+        results = await api.gather(api.list_models(p["id"]) for p in projects)
+    return sum(len(models) for models in results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare sync and async list_models fan-out against a local stub")
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--limit-per-host", type=int, default=20)
+    args = parser.parse_args()
+
+    with StubServer(StubState(projects=args.projects, latency=args.latency)) as server:
+        os.environ["QONIC_API_URL"] = server.url
+        projects = server.state.projects
+
+        start = time.perf_counter()
+        models = run_sync(projects)
+        sync_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        async_models = asyncio.run(run_async(projects, args.limit_per_host))
+        async_time = time.perf_counter() - start
+
+    assert models == async_models
+    print(f"sync  QonicApi:      {len(projects)} calls in {sync_time:.2f}s ({len(projects) / sync_time:.1f} req/s)")
+    print(f"async AsyncQonicApi: {len(projects)} calls in {async_time:.2f}s ({len(projects) / async_time:.1f} req/s)")
+    print(f"speedup: {sync_time / async_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
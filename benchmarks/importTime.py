@@ -0,0 +1,87 @@
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# Only needed for the browser login, the CLI of modelCache, the async client or ProductTable
+DEFERRED = ("oauthFlow", "http.server", "webbrowser", "dotenv", "asyncio", "sqlite3", "argparse", "cryptography",
+            "numpy")
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int, int]]:
+    # One fresh interpreter per sample; -X importtime reports self and cumulative microseconds per module
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            times[name] = (int(own), int(cumulative), len(indent) // 2)
+    return times
+
+
+def measure(module: str, baseline: str, repeat: int) -> Dict[str, object]:
+    import_times(module)  # populate __pycache__ so every sample is a warm-disk cold start
+    totals: List[float] = []
+    overheads: List[float] = []
+    last: Dict[str, Tuple[int, int, int]] = {}
+    for _ in range(repeat):
+        last = import_times(module)
+        base = import_times(baseline)
+        total = last[module][1] / 1000
+        totals.append(total)
+        overheads.append(total - base[baseline][1] / 1000)
+    startup = import_times("sys")  # modules every interpreter loads before running the import
+    heaviest = sorted(((cumulative, name) for name, (_, cumulative, depth) in last.items()
+                       if depth == 1 and name not in startup), reverse=True)
+    return {
+        "total_ms": statistics.median(totals),
+        "overhead_ms": statistics.median(overheads),
+        "deferred_loaded": [name for name in DEFERRED if name in last],
+        "heaviest": [(name, cumulative / 1000) for cumulative, name in heaviest[:10]],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the cold-start import time of the client")
+    parser.add_argument("--module", default="QonicApi")
+    parser.add_argument("--baseline", default="requests",
+                        help="dependency whose own import time is subtracted to get the client overhead")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--budget", type=float, default=40.0, help="allowed client overhead in ms")
+    parser.add_argument("--total-budget", type=float, help="allowed total import time in ms")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    result = measure(args.module, args.baseline, args.repeat)
+    print(f"import {args.module}: {result['total_ms']:.1f} ms total, "
+          f"{result['overhead_ms']:.1f} ms on top of {args.baseline} (median of {args.repeat})")
+    print(f"{'module':<32} {'cumulative ms':>14}")
+    for name, ms in result["heaviest"]:
+        print(f"{name:<32} {ms:>14.1f}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+    failures = []
+    if result["deferred_loaded"]:
+        failures.append(f"loaded at import time: {', '.join(result['deferred_loaded'])}")
+    if result["overhead_ms"] > args.budget:
+        failures.append(f"overhead {result['overhead_ms']:.1f} ms exceeds budget of {args.budget:.1f} ms")
+    if args.total_budget is not None and result["total_ms"] > args.total_budget:
+        failures.append(f"total {result['total_ms']:.1f} ms exceeds budget of {args.total_budget:.1f} ms")
+    for line in failures:
+        print(f"REGRESSION {line}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import timeit
+from typing import Any, Dict, List
+
+from jsonCodec import available_codecs
+
+
+def query_result(rows: int, fields: int) -> Dict[str, Any]:
+    classes = ("Wall", "Beam", "Slab", "Column", "Door", "Window")
+    result = []
+    for i in range(rows):
+        row: Dict[str, Any] = {
+            "Guid": f"3vB2YO$MX4xv5uCqZZG0{i:06d}",
+            "Class": classes[i % len(classes)],
+            "Name": f"Basic Wall:Interior - 138mm Partition:{i}",
+        }
+        for f in range(fields):
+            row[f"Property{f}"] = {"PropertySet": f"Pset_{classes[i % len(classes)]}Common", "Value": f"F{i % 120}"}
+        result.append(row)
+    return {"result": result}
+
+
+def modification(rows: int) -> Dict[str, Any]:
+    return {
+        "add": {
+            "FireRating": {
+                f"3vB2YO$MX4xv5uCqZZG0{i:06d}": {"PropertySet": "Pset_BeamCommon", "Value": f"F{i % 200}"}
+                for i in range(rows)
+            }
+        }
+    }
+
+
+def run(payloads: Dict[str, Any], number: int) -> List[str]:
+    lines = [f"{'payload':<20} {'codec':<8} {'encode ms':>10} {'decode ms':>10} {'size kB':>9}"]
+    for name, payload in payloads.items():
+        for codec in available_codecs():
+            encoded = codec.dumps(payload)
+            encode = timeit.timeit(lambda: codec.dumps(payload), number=number) / number
+            decode = timeit.timeit(lambda: codec.loads(encoded), number=number) / number
+            lines.append(f"{name:<20} {codec.name:<8} {encode * 1000:>10.2f} {decode * 1000:>10.2f} "
+                         f"{len(encoded) / 1024:>9.0f}")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the installed JSON codecs on product payloads")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--fields", type=int, default=12)
+    parser.add_argument("--number", type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = {
+        "query_products": query_result(args.rows, args.fields),
+        "modify_products": modification(args.rows),
+    }
+    print("\n".join(run(payloads, args.number)))
+
+
+if __name__ == "__main__":
+    main()
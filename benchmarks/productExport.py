@@ -0,0 +1,66 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.stubServer import StubProcess
+
+FIELDS = ["Guid", "Class", "Name", "FireRating", "LoadBearing", "Width", "Height", "Reference", "Status"]
+
+
+def formats() -> list[str]:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("pyarrow is not installed, skipping Parquet")
+        return ["csv", "jsonl"]
+    return ["parquet", "csv", "jsonl"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure streaming product export throughput against a local stub")
+    parser.add_argument("--products", type=int, default=500000)
+    parser.add_argument("--models", type=int, default=4)
+    parser.add_argument("--row-group-size", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with StubProcess(projects=1, models=args.models, products=args.products) as stub, \
+            tempfile.TemporaryDirectory() as tmp:
+        os.environ["QONIC_API_URL"] = stub.url
+        from QonicApi import QonicApi
+        from productExport import EXTENSIONS, export_models, export_products
+
+        api = QonicApi()
+        api.access_token = "benchmark"
+        print(f"{'format':<8} {'rows':>9} {'MB':>8} {'seconds':>8} {'rows/s':>10} {'peak MB':>8}")
+        for format in formats():
+            path = Path(tmp) / f"single{EXTENSIONS[format]}"
+            result = export_products(api, "p0", "p0-m0", FIELDS, path, row_group_size=args.row_group_size)
+            # A second, traced run: tracemalloc slows the export down, so it is not timed
+            tracemalloc.start()
+            export_products(api, "p0", "p0-m0", FIELDS, path, row_group_size=args.row_group_size)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{format:<8} {result.rows:>9} {result.bytes / 1e6:>8.1f} {result.seconds:>8.2f} "
+                  f"{result.rows_per_second:>10.0f} {peak / 1e6:>8.1f}")
+
+        for format in formats():
+            for workers in (1, args.workers):
+                started = time.perf_counter()
+                results = export_models(api, "p0", [f"p0-m{i}" for i in range(args.models)], FIELDS,
+                                        Path(tmp) / f"{format}-{workers}", format=format,
+                                        row_group_size=args.row_group_size, max_workers=workers)
+                seconds = time.perf_counter() - started
+                failed = [r for r in results if r.error is not None]
+                if failed:
+                    raise SystemExit(f"{failed[0].model_id}: {failed[0].error}")
+                rows = sum(r.rows for r in results)
+                print(f"{format:<8} {args.models} models, {workers} workers: {rows} rows in {seconds:.2f}s "
+                      f"({rows / seconds:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
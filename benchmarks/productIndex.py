@@ -0,0 +1,66 @@
+import argparse
+import os
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks.stubServer import StubProcess
+
+FIELDS = ["Guid", "Class", "Name", "FireRating", "LoadBearing", "Width", "Height", "Reference"]
+
+FILTERS: Dict[str, List[Dict[str, Any]]] = {
+    "class_equals": [{"property": "Class", "value": "Beam", "operator": "Equals"}],
+    "class_contains": [{"property": "Class", "value": "oo", "operator": "Contains"}],
+    "guid_in": [{"property": "Guid", "value": [f"p0-m0-{i:08d}" for i in range(0, 100000, 1000)], "operator": "In"}],
+    "name_equals": [{"property": "Name", "value": "Wall 4000", "operator": "Equals"}],
+    "width_range": [{"property": "Width", "value": 9.5, "operator": "GreaterThan"}],
+    "class_and_range": [{"property": "Class", "value": "Slab", "operator": "Equals"},
+                        {"property": "Height", "value": 1.0, "operator": "LessThanOrEquals"}],
+    "reference_contains": [{"property": "Reference", "value": "-42", "operator": "Contains"}],
+}
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare ProductIndex lookups with remote product queries")
+    parser.add_argument("--products", type=int, default=500000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds of latency injected per request")
+    args = parser.parse_args()
+
+    with StubProcess(projects=1, models=1, products=args.products, latency=args.latency) as stub:
+        os.environ["QONIC_API_URL"] = stub.url
+        from QonicApi import QonicApi
+        from productIndex import ProductIndex
+        from productTable import ProductTable
+
+        api = QonicApi()
+        api.access_token = "benchmark"
+        started = time.perf_counter()
+        table = ProductTable.from_rows(api.query_products_stream("p0", "p0-m0", FIELDS), FIELDS)
+        loaded = time.perf_counter() - started
+        started = time.perf_counter()
+        index = ProductIndex(table)
+        built = time.perf_counter() - started
+        print(f"{len(index)} products loaded in {loaded:.2f}s, indexed in {built:.2f}s")
+
+        print(f"{'filter':<20} {'rows':>8} {'remote ms':>10} {'local ms':>10} {'speedup':>8}")
+        for name, filters in FILTERS.items():
+            remote, expected = timed(lambda: api.query_products("p0", "p0-m0", FIELDS, filters), 1)
+            local, rows = timed(lambda: index.query(filters), args.repeat)
+            if rows != expected:
+                raise SystemExit(f"{name}: local result differs from the remote query")
+            print(f"{name:<20} {len(rows):>8} {remote * 1000:>10.1f} {local * 1000:>10.1f} {remote / local:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
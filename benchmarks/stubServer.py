@@ -0,0 +1,731 @@
+import argparse
+import gzip
+import hashlib
+import itertools
+import json
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+CLASSES = ("Wall", "Beam", "Slab", "Column", "Door", "Window", "Stair", "Roof")
+PROPERTY_FIELDS = ("FireRating", "LoadBearing", "IsExternal", "AcousticRating", "Width", "Height", "Length",
+                   "NetVolume", "GrossArea", "Reference", "Status", "ThermalTransmittance")
+NUMERIC_FIELDS = frozenset({"Width", "Height", "Length", "NetVolume", "GrossArea", "ThermalTransmittance"})
+
+
+def _matches(row_value: Any, operator: str, value: Any) -> bool:
+    if isinstance(row_value, dict):
+        row_value = row_value.get("Value")
+    if operator == "In":
+        return row_value in value
+    if operator == "Equals":
+        return row_value == value
+    if operator == "NotEquals":
+        return row_value != value
+    if row_value is None:
+        return False
+    if operator == "Contains":
+        return str(value).lower() in str(row_value).lower()
+    if operator == "GreaterThan":
+        return row_value > value
+    if operator == "GreaterThanOrEquals":
+        return row_value >= value
+    if operator == "LessThan":
+        return row_value < value
+    if operator == "LessThanOrEquals":
+        return row_value <= value
+    return False
+
+
+class SyntheticModel:
+    # Products are generated on the fly from their index; only modifications are kept in memory
+    def __init__(self, model_id: str, products: int):
+        self.id = model_id
+        self.products = products
+        self.version = 1
+        self.overrides: Dict[str, Dict[str, Any]] = {}
+        self.deleted: set[str] = set()
+        # State as of the last publish, restored by discard
+        self.published: Tuple[Dict[str, Dict[str, Any]], set[str]] = ({}, set())
+
+    def publish(self) -> None:
+        self.version += 1
+        self.published = ({guid: dict(fields) for guid, fields in self.overrides.items()}, set(self.deleted))
+
+    def discard(self) -> None:
+        overrides, deleted = self.published
+        self.overrides = {guid: dict(fields) for guid, fields in overrides.items()}
+        self.deleted = set(deleted)
+
+    def guid(self, index: int) -> str:
+        return f"{self.id}-{index:08d}"
+
+    def generated(self, index: int, field: str) -> Any:
+        if field == "Guid":
+            return self.guid(index)
+        if field == "Class":
+            return CLASSES[index % len(CLASSES)]
+        if field == "Name":
+            return f"{CLASSES[index % len(CLASSES)]} {index}"
+        if field == "FireRating" and index % 3:
+            return {"PropertySet": None, "Value": None}
+        if field in NUMERIC_FIELDS:
+            value = round(0.1 + (index * 7919 % 10000) / 1000, 3)
+        else:
+            value = f"{field}-{index % 97}"
+        return {"PropertySet": f"Pset_{CLASSES[index % len(CLASSES)]}Common", "Value": value}
+
+    def value(self, index: int, field: str) -> Any:
+        overrides = self.overrides.get(self.guid(index))
+        if overrides and field in overrides:
+            return overrides[field]
+        return self.generated(index, field)
+
+    def candidates(self, filters: List[Dict[str, Any]]) -> Iterable[int]:
+        # Guid In filters are answered from the GUID itself, like a primary key lookup on a real server
+        for f in filters:
+            if f["property"] == "Guid" and f.get("operator") == "In":
+                prefix = self.id + "-"
+                indices = {int(g[len(prefix):]) for g in f.get("value") or ()
+                           if isinstance(g, str) and g.startswith(prefix) and g[len(prefix):].isdigit()}
+                return sorted(i for i in indices if i < self.products)
+        return range(self.products)
+
+    def rows(self, fields: List[str], filters: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for index in self.candidates(filters):
+            if self.deleted and self.guid(index) in self.deleted:
+                continue
+            if all(_matches(self.value(index, f["property"]), f.get("operator", "Equals"), f.get("value"))
+                   for f in filters):
+                yield {field: self.value(index, field) for field in fields}
+
+    def modify(self, changes: Dict[str, Any]) -> List[Dict[str, str]]:
+        errors = []
+        for action in ("add", "update", "delete"):
+            for field, products in (changes.get(action) or {}).items():
+                for guid, value in products.items():
+                    if guid in self.deleted or not guid.startswith(self.id + "-"):
+                        errors.append({"guid": guid, "field": field, "error": "ProductNotFound",
+                                       "description": f"No product with guid {guid}"})
+                        continue
+                    if action == "delete" or value is None:
+                        value = {"PropertySet": None, "Value": None}
+                    self.overrides.setdefault(guid, {})[field] = value
+        return errors
+
+
+class StubState:
+    def __init__(self, projects: int = 10, models_per_project: int = 5, products_per_model: int = 1000,
+                 latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.products_per_model = products_per_model
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.projects = [{"id": f"p{i}", "name": f"Project {i}"} for i in range(projects)]
+        self.models: Dict[str, Dict[str, SyntheticModel]] = {
+            p["id"]: {f"{p['id']}-m{j}": SyntheticModel(f"{p['id']}-m{j}", products_per_model)
+                      for j in range(models_per_project)}
+            for p in self.projects
+        }
+        self.operations: Dict[str, Dict[str, Any]] = {}
+        self.storage: Dict[str, bytes] = {}
+        self.codifications: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.property_sets: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.materials: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.locations: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.types: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def model(self, project_id: str, model_id: str) -> Optional[SyntheticModel]:
+        return self.models.get(project_id, {}).get(model_id)
+
+    def new_guid(self) -> str:
+        return str(uuid.UUID(int=self.random.getrandbits(128)))
+
+    def new_operation(self, result: Optional[bytes] = None, **extra: Any) -> Dict[str, Any]:
+        operation = {"id": self.new_guid(), "status": "Ready", **extra}
+        if result is not None:
+            self.storage[operation["id"]] = result
+        self.operations[operation["id"]] = operation
+        return operation
+
+
+class Request:
+    def __init__(self, method: str, path: str, query: str, headers, body: bytes, groups: Tuple[str, ...]):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.groups = groups
+
+    def json(self) -> Any:
+        return json.loads(self.body) if self.body else {}
+
+
+Response = Tuple[int, Any] | Tuple[int, Any, Dict[str, str]]
+Route = Tuple[str, re.Pattern, Callable[[StubState, Request], Response]]
+ROUTES: List[Route] = []
+
+
+def route(method: str, pattern: str):
+    def register(fn: Callable[..., Response]):
+        ROUTES.append((method, re.compile(f"^/{pattern}$"), fn))
+        return fn
+    return register
+
+
+def _storage_url(req: Request, key: str) -> str:
+    # Pre-signed storage URLs point back at the stub itself
+    return f"http://{req.headers.get('Host', '127.0.0.1')}/storage/{key}"
+
+
+# --- projects, models and products -------------------------------------------
+
+@route("GET", "projects")
+def list_projects(state: StubState, req: Request) -> Response:
+    return 200, {"projects": state.projects}
+
+
+@route("GET", "projects/([^/]+)/models")
+def list_models(state: StubState, req: Request) -> Response:
+    models = state.models.get(req.groups[0], {}).values()
+    return 200, {"models": [{"id": m.id, "name": f"Model {m.id}", "version": m.version} for m in models]}
+
+
+@route("POST", "projects/([^/]+)/models")
+def create_model(state: StubState, req: Request) -> Response:
+    body = req.json()
+    project_id = req.groups[0]
+    model_id = f"{project_id}-m{len(state.models.get(project_id, {}))}"
+    state.models.setdefault(project_id, {})[model_id] = SyntheticModel(model_id, state.products_per_model)
+    return 200, state.new_operation(modelId=model_id, name=body.get("modelName"))
+
+
+@route("GET", "projects/([^/]+)/models/([^/]+)/products/properties/available-data")
+def available_data(state: StubState, req: Request) -> Response:
+    if state.model(*req.groups) is None:
+        return 404, {"error": "NotFound"}
+    return 200, {"fields": ["Guid", "Class", "Name", *PROPERTY_FIELDS]}
+
+
+@route("POST", "projects/([^/]+)/models/([^/]+)/products/properties/query")
+def query_products(state: StubState, req: Request) -> Response:
+    model = state.model(*req.groups)
+    if model is None:
+        return 404, {"error": "NotFound"}
+    body = req.json()
+    filters = body.get("filters") or []
+    return 200, {"result": list(model.rows(body.get("fields", []), filters))}
+
+
+@route("POST", "projects/([^/]+)/models/([^/]+)/products/quantities/query")
+def query_quantities(state: StubState, req: Request) -> Response:
+    model = state.model(*req.groups)
+    if model is None:
+        return 404, {"error": "NotFound"}
+    body = req.json()
+    calculators = body.get("calculators", [])
+    rows = [{"Guid": row["Guid"], **{c: 1.0 for c in calculators}}
+            for row in model.rows(["Guid"], body.get("filters") or [])]
+    return 200, state.new_operation(json.dumps({"quantities": rows}).encode("utf-8"))
+
+
+@route("GET", "projects/([^/]+)/models/([^/]+)/products/quantities/([^/]+)/result")
+def quantities_result(state: StubState, req: Request) -> Response:
+    return 302, None, {"Location": _storage_url(req, req.groups[2])}
+
+
+@route("POST", "projects/([^/]+)/models/([^/]+)/start-session")
+def start_session(state: StubState, req: Request) -> Response:
+    return 200, None
+
+
+@route("POST", "projects/([^/]+)/models/([^/]+)/end-session")
+def end_session(state: StubState, req: Request) -> Response:
+    return 200, None
+
+
+@route("POST", "projects/([^/]+)/models/([^/]+)/products")
+def modify_products(state: StubState, req: Request) -> Response:
+    model = state.model(*req.groups)
+    if model is None:
+        return 404, {"error": "NotFound"}
+    with state.lock:
+        return 200, {"errors": model.modify(req.json())}
+
+
+@route("DELETE", "projects/([^/]+)/models/([^/]+)/products/([^/]+)")
+def delete_product(state: StubState, req: Request) -> Response:
+    model = state.model(req.groups[0], req.groups[1])
+    if model is None:
+        return 404, {"error": "NotFound"}
+    with state.lock:
+        model.deleted.add(req.groups[2])
+    return 200, None
+
+
+@route("POST", "projects/([^/]+)/models/([^/]+)/publish")
+def publish(state: StubState, req: Request) -> Response:
+    model = state.model(*req.groups)
+    if model is None:
+        return 404, {"error": "NotFound"}
+    with state.lock:
+        model.publish()
+    return 200, None
+
+
+@route("POST", "projects/([^/]+)/models/([^/]+)/discard")
+def discard(state: StubState, req: Request) -> Response:
+    model = state.model(*req.groups)
+    if model is None:
+        return 404, {"error": "NotFound"}
+    with state.lock:
+        model.discard()
+    return 200, None
+
+
+@route("POST", "projects/([^/]+)/models/([^/]+)/export-ifc")
+def export_ifc(state: StubState, req: Request) -> Response:
+    model = state.model(*req.groups)
+    if model is None:
+        return 404, {"error": "NotFound"}
+    content = b"ISO-10303-21;\n" + b"".join(f"#{i}=IFCWALL('{model.guid(i)}');\n".encode("ascii")
+                                            for i in range(model.products)) + b"END-ISO-10303-21;\n"
+    return 200, state.new_operation(content)
+
+
+@route("GET", "projects/([^/]+)/models/([^/]+)/export-ifc/([^/]+)/result")
+def export_ifc_result(state: StubState, req: Request) -> Response:
+    return 302, None, {"Location": _storage_url(req, req.groups[2])}
+
+
+@route("GET", "operations/([^/]+)")
+def get_operation(state: StubState, req: Request) -> Response:
+    operation = state.operations.get(req.groups[0])
+    if operation is None:
+        return 404, {"error": "NotFound"}
+    return 200, operation
+
+
+@route("GET", "upload-url")
+def upload_url(state: StubState, req: Request) -> Response:
+    return 200, {"uploadUrl": _storage_url(req, state.new_guid())}
+
+
+@route("PUT", "storage/([^/]+)")
+def storage_put(state: StubState, req: Request) -> Response:
+    state.storage[req.groups[0]] = req.body
+    return 200, None
+
+
+@route("GET", "storage/([^/]+)")
+def storage_get(state: StubState, req: Request) -> Response:
+    content = state.storage.get(req.groups[0])
+    if content is None:
+        return 404, {"error": "NotFound"}
+    return 200, content
+
+
+# --- libraries ---------------------------------------------------------------
+
+def _collection(store: Dict[str, Dict[str, Dict[str, Any]]], project_id: str) -> Dict[str, Dict[str, Any]]:
+    return store.setdefault(project_id, {})
+
+
+def _create(state: StubState, store, req: Request, key: str = "guid", **extra: Any) -> Response:
+    item = {**req.json(), key: state.new_guid(), **extra}
+    _collection(store, req.groups[0])[item[key]] = item
+    return 200, item
+
+
+def _update(store, req: Request, item_id: str) -> Response:
+    item = _collection(store, req.groups[0]).get(item_id)
+    if item is None:
+        return 404, {"error": "NotFound"}
+    item.update(req.json())
+    return 200, item
+
+
+def _delete(store, req: Request, item_id: str) -> Response:
+    if _collection(store, req.groups[0]).pop(item_id, None) is None:
+        return 404, {"error": "NotFound"}
+    return 200, None
+
+
+@route("GET", "projects/([^/]+)/codifications")
+def list_codifications(state: StubState, req: Request) -> Response:
+    return 200, {"codificationLibraries": list(_collection(state.codifications, req.groups[0]).values())}
+
+
+@route("POST", "projects/([^/]+)/codifications")
+def create_codification_library(state: StubState, req: Request) -> Response:
+    return _create(state, state.codifications, req, codes=[])
+
+
+@route("GET", "projects/([^/]+)/codifications/([^/]+)")
+def get_codification_library(state: StubState, req: Request) -> Response:
+    library = _collection(state.codifications, req.groups[0]).get(req.groups[1])
+    return (200, library) if library else (404, {"error": "NotFound"})
+
+
+@route("DELETE", "projects/([^/]+)/codifications/([^/]+)")
+def delete_codification_library(state: StubState, req: Request) -> Response:
+    return _delete(state.codifications, req, req.groups[1])
+
+
+@route("POST", "projects/([^/]+)/codifications/([^/]+)/codification")
+def create_classification_code(state: StubState, req: Request) -> Response:
+    library = _collection(state.codifications, req.groups[0]).get(req.groups[1])
+    if library is None:
+        return 404, {"error": "NotFound"}
+    code = {**req.json(), "guid": state.new_guid()}
+    library["codes"].append(code)
+    return 200, code
+
+
+def _find_code(state: StubState, req: Request) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    library = _collection(state.codifications, req.groups[0]).get(req.groups[1])
+    if library is None:
+        return None, None
+    return library, next((c for c in library["codes"] if c["guid"] == req.groups[2]), None)
+
+
+@route("PUT", "projects/([^/]+)/codifications/([^/]+)/codification/([^/]+)")
+def update_classification_code(state: StubState, req: Request) -> Response:
+    _, code = _find_code(state, req)
+    if code is None:
+        return 404, {"error": "NotFound"}
+    code.update(req.json())
+    return 200, None
+
+
+@route("DELETE", "projects/([^/]+)/codifications/([^/]+)/codification/([^/]+)")
+def delete_classification_code(state: StubState, req: Request) -> Response:
+    library, code = _find_code(state, req)
+    if code is None:
+        return 404, {"error": "NotFound"}
+    library["codes"].remove(code)
+    return 200, None
+
+
+@route("GET", "projects/([^/]+)/customProperties")
+def custom_properties(state: StubState, req: Request) -> Response:
+    sets = list(_collection(state.property_sets, req.groups[0]).values())
+    return 200, {"libraryId": req.groups[0], "sets": sets}
+
+
+@route("POST", "projects/([^/]+)/customProperties/property-sets")
+def create_property_set(state: StubState, req: Request) -> Response:
+    body = req.json()
+    item = {"id": next(state.ids), "name": body.get("Name"), "propertyDefinitions": []}
+    _collection(state.property_sets, req.groups[0])[str(item["id"])] = item
+    return 200, item
+
+
+@route("PUT", "projects/([^/]+)/customProperties/property-sets/([^/]+)")
+def update_property_set(state: StubState, req: Request) -> Response:
+    return _update(state.property_sets, req, req.groups[1])
+
+
+@route("DELETE", "projects/([^/]+)/customProperties/property-sets/([^/]+)")
+def delete_property_set(state: StubState, req: Request) -> Response:
+    return _delete(state.property_sets, req, req.groups[1])
+
+
+@route("POST", "projects/([^/]+)/customProperties/property-sets/([^/]+)/property")
+def add_property_definition(state: StubState, req: Request) -> Response:
+    property_set = _collection(state.property_sets, req.groups[0]).get(req.groups[1])
+    if property_set is None:
+        return 404, {"error": "NotFound"}
+    body = req.json()
+    definition = {"id": next(state.ids), "guid": state.new_guid(), "name": body.get("Name"),
+                  "dataType": body.get("DataType"), "measureType": None, "unitName": None}
+    property_set["propertyDefinitions"].append(definition)
+    return 200, definition
+
+
+def _find_definition(state: StubState, req: Request):
+    property_set = _collection(state.property_sets, req.groups[0]).get(req.groups[1])
+    if property_set is None:
+        return None, None
+    definitions = property_set["propertyDefinitions"]
+    return property_set, next((d for d in definitions if str(d["id"]) == req.groups[2]), None)
+
+
+@route("PUT", "projects/([^/]+)/customProperties/property-sets/([^/]+)/property/([^/]+)")
+def update_property_definition(state: StubState, req: Request) -> Response:
+    _, definition = _find_definition(state, req)
+    if definition is None:
+        return 404, {"error": "NotFound"}
+    definition.update(req.json())
+    return 200, definition
+
+
+@route("DELETE", "projects/([^/]+)/customProperties/property-sets/([^/]+)/property/([^/]+)")
+def delete_property_definition(state: StubState, req: Request) -> Response:
+    property_set, definition = _find_definition(state, req)
+    if definition is None:
+        return 404, {"error": "NotFound"}
+    property_set["propertyDefinitions"].remove(definition)
+    return 200, None
+
+
+@route("GET", "projects/([^/]+)/material-libraries")
+def material_overview(state: StubState, req: Request) -> Response:
+    libraries = _collection(state.materials, req.groups[0]).values()
+    return 200, {"materialProperties": [
+        {"guid": lib["guid"], "name": lib.get("Name"),
+         "properties": [[{"name": k, "value": v} for k, v in m.items()] for m in lib["materials"]]}
+        for lib in libraries
+    ]}
+
+
+@route("POST", "projects/([^/]+)/material-libraries")
+def create_material_library(state: StubState, req: Request) -> Response:
+    return _create(state, state.materials, req, materials=[])
+
+
+@route("GET", "projects/([^/]+)/material-libraries/([^/]+)")
+def get_material_library(state: StubState, req: Request) -> Response:
+    library = _collection(state.materials, req.groups[0]).get(req.groups[1])
+    return (200, library) if library else (404, {"error": "NotFound"})
+
+
+@route("DELETE", "projects/([^/]+)/material-libraries/([^/]+)")
+def delete_material_library(state: StubState, req: Request) -> Response:
+    return _delete(state.materials, req, req.groups[1])
+
+
+@route("POST", "projects/([^/]+)/material-libraries/([^/]+)/materials")
+def create_material(state: StubState, req: Request) -> Response:
+    library = _collection(state.materials, req.groups[0]).get(req.groups[1])
+    if library is None:
+        return 404, {"error": "NotFound"}
+    material = {**req.json(), "guid": state.new_guid()}
+    library["materials"].append(material)
+    return 200, material
+
+
+def _find_material(state: StubState, req: Request):
+    library = _collection(state.materials, req.groups[0]).get(req.groups[1])
+    if library is None:
+        return None, None
+    return library, next((m for m in library["materials"] if m["guid"] == req.groups[2]), None)
+
+
+@route("PUT", "projects/([^/]+)/material-libraries/([^/]+)/materials/([^/]+)")
+def update_material(state: StubState, req: Request) -> Response:
+    _, material = _find_material(state, req)
+    if material is None:
+        return 404, {"error": "NotFound"}
+    material.update(req.json())
+    return 200, None
+
+
+@route("DELETE", "projects/([^/]+)/material-libraries/([^/]+)/materials/([^/]+)")
+def delete_material(state: StubState, req: Request) -> Response:
+    library, material = _find_material(state, req)
+    if material is None:
+        return 404, {"error": "NotFound"}
+    library["materials"].remove(material)
+    return 200, None
+
+
+def _location_view(location: Dict[str, Any], locations: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "name": location["name"],
+        "properties": [{"name": "Guid", "value": location["guid"]}, {"name": "Type", "value": location.get("type")}],
+        "children": [_location_view(child, locations) for child in locations.values()
+                     if child.get("parentGuid") == location["guid"]],
+    }
+
+
+@route("GET", "projects/([^/]+)/locations")
+def get_locations(state: StubState, req: Request) -> Response:
+    locations = _collection(state.locations, req.groups[0])
+    roots = [loc for loc in locations.values() if not loc.get("parentGuid")]
+    return 200, {"locationViews": [_location_view(loc, locations) for loc in roots]}
+
+
+@route("POST", "projects/([^/]+)/locations")
+def create_location(state: StubState, req: Request) -> Response:
+    _, location = _create(state, state.locations, req)
+    return 200, _location_view(location, _collection(state.locations, req.groups[0]))
+
+
+@route("PUT", "projects/([^/]+)/locations/([^/]+)")
+def update_location(state: StubState, req: Request) -> Response:
+    return _update(state.locations, req, req.groups[1])
+
+
+@route("DELETE", "projects/([^/]+)/locations/([^/]+)")
+def delete_location(state: StubState, req: Request) -> Response:
+    return _delete(state.locations, req, req.groups[1])
+
+
+@route("GET", "projects/([^/]+)/types")
+def get_types(state: StubState, req: Request) -> Response:
+    return 200, {"types": list(_collection(state.types, req.groups[0]).values())}
+
+
+@route("POST", "projects/([^/]+)/types/([^/]+)")
+def create_type(state: StubState, req: Request) -> Response:
+    return _create(state, state.types, req, library=req.groups[1])
+
+
+@route("PUT", "projects/([^/]+)/types/([^/]+)/types/([^/]+)")
+def update_type(state: StubState, req: Request) -> Response:
+    return _update(state.types, req, req.groups[2])
+
+
+@route("DELETE", "projects/([^/]+)/types/([^/]+)/types/([^/]+)")
+def delete_type(state: StubState, req: Request) -> Response:
+    return _delete(state.types, req, req.groups[2])
+
+
+# --- HTTP plumbing -----------------------------------------------------------
+
+def make_handler(state: StubState):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _dispatch(self, method: str):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            path, _, query = self.path.partition("?")
+            path = path.rstrip("/")
+            if state.latency:
+                time.sleep(state.latency)
+            if state.error_rate and not path.startswith("/storage") and state.random.random() < state.error_rate:
+                self._send(503, {"error": "ServiceUnavailable"}, headers={"Retry-After": "0"})
+                return
+            for route_method, pattern, handler in ROUTES:
+                match = pattern.match(path)
+                if route_method == method and match:
+                    result = handler(state, Request(method, path, query, self.headers, body, match.groups()))
+                    break
+            else:
+                result = 404, {"error": "NotFound", "detail": path}
+            status, payload, headers = result if len(result) == 3 else (*result, None)
+            self._send(status, payload, headers=headers, etag=method == "GET")
+
+        def _send(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None, etag: bool = False):
+            if isinstance(body, bytes):
+                payload, content_type = body, "application/octet-stream"
+            else:
+                payload = json.dumps(body).encode("utf-8") if body is not None else b""
+                content_type = "application/json"
+            tag = None
+            if etag and status == 200:
+                tag = '"' + hashlib.sha1(payload).hexdigest()[:16] + '"'
+                if self.headers.get("If-None-Match") == tag:
+                    status, payload = 304, b""
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if tag:
+                self.send_header("ETag", tag)
+            if len(payload) > 1024 and "gzip" in self.headers.get("Accept-Encoding", ""):
+                payload = gzip.compress(payload, compresslevel=1)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_PUT(self):
+            self._dispatch("PUT")
+
+        def do_DELETE(self):
+            self._dispatch("DELETE")
+
+        def log_message(self, fmt, *args):
+            return
+
+    return StubHandler
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class StubServer:
+    def __init__(self, state: StubState | None = None, port: int = 0):
+        self.state = state or StubState()
+        self.httpd = _StubHTTPServer(("127.0.0.1", port), make_handler(self.state))
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self) -> "StubServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class StubProcess:
+    # Runs the stub in a child process so it does not share the GIL or the heap with the client under test
+    def __init__(self, **options: Any):
+        self.args = [sys.executable, "-m", "benchmarks.stubServer", "--port", "0"]
+        for name, value in options.items():
+            self.args += [f"--{name.replace('_', '-')}", str(value)]
+        self.process: Optional[subprocess.Popen] = None
+        self.url = ""
+
+    def __enter__(self) -> "StubProcess":
+        self.process = subprocess.Popen(self.args, stdout=subprocess.PIPE, text=True)
+        line = self.process.stdout.readline()
+        self.url = line.rsplit(" ", 1)[-1].strip()
+        if not self.url.startswith("http"):
+            self.process.kill()
+            raise RuntimeError(f"Stub server failed to start: {line!r}")
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.process.terminate()
+        self.process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a synthetic Qonic API for benchmarks and offline runs")
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--models", type=int, default=5)
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of API requests answered with 503")
+    args = parser.parse_args()
+
+    state = StubState(args.projects, args.models, args.products, args.latency, args.error_rate)
+    with StubServer(state, port=args.port) as server:
+        print(f"Stub Qonic API listening on {server.url}", flush=True)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from benchmarks.stubServer import StubProcess
+
+PROJECT = "p0"
+MODEL = "p0-m0"
+QUERY_FIELDS = ["Guid", "Class", "Name", "FireRating", "LoadBearing", "Width", "Height", "Reference"]
+
+Benchmark = Callable[[Any, Dict[str, Any]], Any]
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str):
+    def register(fn: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+@contextlib.contextmanager
+def scripted_input(*answers: str):
+    # Runs an interactive sample.py handler with canned answers and without console output
+    replies = iter(answers)
+    original = builtins.input
+    builtins.input = lambda prompt="": next(replies)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        builtins.input = original
+
+
+# --- client methods ----------------------------------------------------------
+
+@benchmark("list_projects")
+def bench_list_projects(api, ctx):
+    return api.list_projects()
+
+
+@benchmark("list_models")
+def bench_list_models(api, ctx):
+    return api.list_models(PROJECT)
+
+
+@benchmark("get_available_product_fields")
+def bench_available_fields(api, ctx):
+    return api.get_available_product_fields(PROJECT, MODEL)
+
+
+@benchmark("query_products")
+def bench_query_products(api, ctx):
+    return api.query_products(PROJECT, MODEL, QUERY_FIELDS)
+
+
+@benchmark("query_products_filtered")
+def bench_query_products_filtered(api, ctx):
+    return api.query_products(PROJECT, MODEL, QUERY_FIELDS,
+                              [{"property": "Class", "value": "Beam", "operator": "Contains"}])
+
+
+@benchmark("query_products_stream")
+def bench_query_products_stream(api, ctx):
+    return sum(1 for _ in api.query_products_stream(PROJECT, MODEL, QUERY_FIELDS))
+
+
+@benchmark("query_products_iter")
+def bench_query_products_iter(api, ctx):
+    return sum(1 for _ in api.query_products_iter(PROJECT, MODEL, QUERY_FIELDS, page_size=500))
+
+
+@benchmark("query_products_sharded")
+def bench_query_products_sharded(api, ctx):
+    return len(api.query_products_sharded(PROJECT, MODEL, QUERY_FIELDS, shards=4).rows)
+
+
+@benchmark("query_batcher")
+def bench_query_batcher(api, ctx):
+    from queryBatcher import QueryBatcher
+    batcher = QueryBatcher(api)
+    filters = [{"property": "Class", "value": "Beam", "operator": "Contains"}]
+    return batcher.query_many((PROJECT, MODEL, [field], filters) for field in QUERY_FIELDS)
+
+
+@benchmark("query_products_table")
+def bench_query_products_table(api, ctx):
+    table = api.query_products_table(PROJECT, MODEL, QUERY_FIELDS, page_size=500)
+    return table.filter([{"property": "Class", "value": "Beam", "operator": "Equals"}]).count_by("FireRating")
+
+
+@benchmark("snapshot_sync")
+def bench_snapshot_sync(api, ctx):
+    from productSync import ProductSnapshot
+    if "snapshot" not in ctx:
+        ctx["snapshot"] = ProductSnapshot(api, PROJECT, MODEL, QUERY_FIELDS).load()
+    ctx["synced"] = ctx.get("synced", 0) + 1
+    api.modify_products(PROJECT, MODEL, {
+        "add": {"FireRating": {f"{MODEL}-{ctx['synced']:08d}": {"PropertySet": "Pset_BeamCommon", "Value": "F90"}}}
+    })
+    return ctx["snapshot"].sync()
+
+
+@benchmark("calculate_quantities")
+def bench_calculate_quantities(api, ctx):
+    operation = api.calculate_quantities(PROJECT, MODEL, ["Length", "GrossArea"])
+    api.get_operation(operation["id"])
+    return api.get_quantities_result_url(PROJECT, MODEL, operation["id"])
+
+
+@benchmark("modification_session")
+def bench_modification_session(api, ctx):
+    api.start_session(PROJECT, MODEL)
+    try:
+        return api.modify_products(PROJECT, MODEL, {
+            "add": {"FireRating": {f"{MODEL}-00000001": {"PropertySet": "Pset_BeamCommon", "Value": "F60"}}}
+        })
+    finally:
+        api.end_session(PROJECT, MODEL)
+
+
+@benchmark("unpublished_edits_model_cache")
+def bench_unpublished_edits_model_cache(api, ctx):
+    # Regression check: edits left unpublished by end_session must never be stored under the published revision
+    if "cached_api" not in ctx:
+        from modelCache import ModelCache
+        ctx["cached_api"] = make_api(True)
+        ctx["cached_api"].model_cache = ModelCache(Path(ctx["tmp"]) / "models.sqlite")
+    cached = ctx["cached_api"]
+    cached.start_session(PROJECT, MODEL)
+    cached.modify_products(PROJECT, MODEL, {
+        "add": {"FireRating": {f"{MODEL}-00000002": {"PropertySet": "Pset_BeamCommon", "Value": "F120"}}}
+    })
+    cached.end_session(PROJECT, MODEL)
+    cached.query_products(PROJECT, MODEL, QUERY_FIELDS)
+    entries = cached.model_cache.stats()["entries"]
+    cached.discard_changes(PROJECT, MODEL)
+    assert entries == 0, f"unpublished edits were written to the ModelCache ({entries} entries)"
+
+
+@benchmark("change_set")
+def bench_change_set(api, ctx):
+    from changeSet import ChangeSet
+    changes = ChangeSet(api.codec)
+    for i in range(2000):
+        guid = f"{MODEL}-{i:08d}"
+        changes.add("FireRating", guid, "F60", "Pset_BeamCommon")
+        changes.update("Reference", guid, {"PropertySet": "Pset_BeamCommon", "Value": f"R-{i}"})
+        if i % 4 == 0:
+            changes.delete("FireRating", guid)
+    return changes.submit(api, PROJECT, MODEL, max_operations=1000)
+
+
+@benchmark("delete_product")
+def bench_delete_product(api, ctx):
+    ctx["deleted"] = ctx.get("deleted", 0) + 1
+    api.delete_product(PROJECT, MODEL, f"{MODEL}-{ctx['deleted']:08d}")
+
+
+@benchmark("delete_products")
+def bench_delete_products(api, ctx):
+    # 200 GUIDs per call, kept apart from the ones delete_product removes
+    start = ctx["bulk_deleted"] = ctx.get("bulk_deleted", 50000) + 200
+    return api.delete_products(PROJECT, MODEL, [f"{MODEL}-{i:08d}" for i in range(start - 200, start)])
+
+
+@benchmark("parallel_model_sessions")
+def bench_parallel_model_sessions(api, ctx):
+    from concurrent.futures import ThreadPoolExecutor
+    from changeSet import ChangeSet
+
+    def edit(model_id: str):
+        changes = ChangeSet(api.codec)
+        for i in range(200):
+            changes.add("FireRating", f"{model_id}-{i:08d}", "F60", "Pset_BeamCommon")
+        with api.model_session(PROJECT, model_id) as session:
+            return session.submit(changes, max_operations=50)
+
+    models = [f"{PROJECT}-m{i}" for i in range(4)]
+    with ThreadPoolExecutor(max_workers=len(models)) as pool:
+        return list(pool.map(edit, models))
+
+
+@benchmark("publish_and_discard")
+def bench_publish(api, ctx):
+    api.publish_changes(PROJECT, MODEL, "benchmark", "benchmark publish")
+    api.discard_changes(PROJECT, MODEL)
+
+
+@benchmark("upload_and_create_model")
+def bench_create_model(api, ctx):
+    upload_url = api.get_upload_url()
+    api.transport.upload(upload_url, ctx["upload_file"])
+    return api.create_model(PROJECT, model_name="bench", upload_url=upload_url, upload_file_name="bench.ifc")
+
+
+@benchmark("export_ifc")
+def bench_export_ifc(api, ctx):
+    operation = api.start_export_ifc(PROJECT, MODEL)
+    url = api.get_export_ifc_result_url(PROJECT, MODEL, operation["id"])
+    return api.transport.download(url, Path(ctx["tmp"]) / "export.ifc")
+
+
+@benchmark("codification_crud")
+def bench_codifications(api, ctx):
+    library = api.create_codification_library(PROJECT, {"name": "Bench", "description": "bench"})
+    code = api.create_classification_code(PROJECT, library["guid"], {"name": "Code", "identification": "0"})
+    api.update_classification_code(PROJECT, library["guid"], code["guid"], {"name": "Renamed"})
+    api.get_codification_library(PROJECT, library["guid"])
+    api.list_codification_libraries(PROJECT)
+    api.delete_classification_code(PROJECT, library["guid"], code["guid"])
+    api.delete_codification_library(PROJECT, library["guid"])
+
+
+@benchmark("custom_property_crud")
+def bench_custom_properties(api, ctx):
+    property_set = api.create_property_set(PROJECT, {"Name": "BenchSet"})
+    definition = api.add_property_definition(PROJECT, property_set["id"], {"Name": "BenchProp", "DataType": "String"})
+    api.update_property_definition(PROJECT, property_set["id"], definition["id"], {"name": "Renamed"})
+    api.update_property_set(PROJECT, property_set["id"], {"name": "Renamed"})
+    api.get_custom_properties(PROJECT)
+    api.delete_property_definition(PROJECT, property_set["id"], definition["id"])
+    api.delete_property_set(PROJECT, property_set["id"])
+
+
+@benchmark("material_crud")
+def bench_materials(api, ctx):
+    library = api.create_material_library(PROJECT, {"Name": "Bench"})
+    material = api.create_material(PROJECT, library["guid"], {"name": "Concrete", "color": "#785B3DFF"})
+    api.update_material(PROJECT, library["guid"], material["guid"], {"name": "Concrete", "color": "#49C73EFF"})
+    api.get_material_overview(PROJECT)
+    api.get_material_library(PROJECT, library["guid"])
+    api.delete_material(PROJECT, library["guid"], material["guid"])
+    api.delete_material_library(PROJECT, library["guid"])
+
+
+@benchmark("location_crud")
+def bench_locations(api, ctx):
+    site = api.create_location(PROJECT, {"name": "Site", "type": "Site", "parentGuid": None})
+    guid = next(p["value"] for p in site["properties"] if p["name"] == "Guid")
+    api.update_location(PROJECT, guid, {"name": "Renamed"})
+    api.get_locations(PROJECT)
+    api.delete_location(PROJECT, guid)
+
+
+@benchmark("type_crud")
+def bench_types(api, ctx):
+    item = api.create_type(PROJECT, "library", {"name": "BenchType"})
+    api.update_type(PROJECT, "library", item["guid"], {"name": "Renamed"})
+    api.get_types(PROJECT)
+    api.delete_type(PROJECT, "library", item["guid"])
+
+
+# --- sample.py workflows -----------------------------------------------------
+
+@benchmark("sample.handle_model_queries")
+def bench_sample_model_queries(api, ctx):
+    import sample
+    with scripted_input(MODEL):
+        sample.handle_model_queries(api, PROJECT)
+
+
+@benchmark("sample.handle_codifications")
+def bench_sample_codifications(api, ctx):
+    import sample
+    with scripted_input():
+        sample.handle_codifications(api, PROJECT)
+
+
+@benchmark("sample.handle_materials")
+def bench_sample_materials(api, ctx):
+    import sample
+    with scripted_input():
+        sample.handle_materials(api, PROJECT)
+
+
+@benchmark("sample.handle_locations")
+def bench_sample_locations(api, ctx):
+    import sample
+    with scripted_input():
+        sample.handle_locations(api, PROJECT)
+
+
+@benchmark("sample.handle_custom_properties")
+def bench_sample_custom_properties(api, ctx):
+    import sample
+    with scripted_input(MODEL):
+        sample.handle_custom_properties(api, PROJECT)
+
+
+@benchmark("sample.handle_delete_product")
+def bench_sample_delete_product(api, ctx):
+    import sample
+    with scripted_input(MODEL):
+        sample.handle_delete_product(api, PROJECT)
+
+
+@benchmark("sample.handle_create_model")
+def bench_sample_create_model(api, ctx):
+    import sample
+    with scripted_input(str(ctx["upload_file"])):
+        sample.handle_create_model(api, PROJECT)
+
+
+@benchmark("sample.handle_export_model")
+def bench_sample_export_model(api, ctx):
+    import sample
+    ctx["exports"] = ctx.get("exports", 0) + 1
+    with scripted_input(MODEL, str(Path(ctx["tmp"]) / f"sample-{ctx['exports']}.ifc")):
+        sample.handle_export_model(api, PROJECT)
+
+
+@benchmark("sample.handle_calculate_quantities")
+def bench_sample_quantities(api, ctx):
+    import sample
+    with scripted_input(MODEL):
+        sample.handle_calculate_quantities(api, PROJECT)
+
+
+# --- runner ------------------------------------------------------------------
+
+def make_api(cached: bool):
+    from QonicApi import QonicApi
+    from httpCache import CachePolicy, DEFAULT_POLICIES
+    policies = None if cached else {name: CachePolicy(ttl=0) for name in DEFAULT_POLICIES}
+    api = QonicApi(cache_policies=policies)
+    api.access_token = "benchmark"
+    return api
+
+
+def prepare(api, ctx: Dict[str, Any]) -> None:
+    # The interactive samples expect at least one codification and material library to exist
+    api.create_codification_library(PROJECT, {"name": "Seed", "description": "seed library"})
+    library = api.create_material_library(PROJECT, {"Name": "Seed"})
+    api.create_material(PROJECT, library["guid"], {"name": "Steel", "color": "#AAAAAAFF"})
+    upload = Path(ctx["tmp"]) / "upload.ifc"
+    upload.write_bytes(b"ISO-10303-21;\n" + b"#1=IFCWALL('x');\n" * 20000 + b"END-ISO-10303-21;\n")
+    ctx["upload_file"] = upload
+
+
+def measure(fn: Benchmark, api, ctx: Dict[str, Any], repeat: int, warmup: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn(api, ctx)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(api, ctx)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    fn(api, ctx)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "mean_ms": statistics.fmean(timings) * 1000,
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        "ops_per_s": len(timings) / sum(timings),
+        "peak_kib": peak / 1024,
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in ("p50_ms", "peak_kib"):
+            if previous[metric] and current[metric] > previous[metric] * (1 + threshold):
+                regressions.append(f"{name}: {metric} {previous[metric]:.1f} -> {current[metric]:.1f}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark QonicApi methods and sample.py workflows against a local stub")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--products", type=int, default=5000, help="synthetic products per model")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds of latency injected per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--cached", action="store_true", help="keep the in-memory response cache enabled")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON file; exit with status 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown before failing")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    with StubProcess(products=args.products, latency=args.latency, error_rate=args.error_rate) as stub, \
+            tempfile.TemporaryDirectory() as tmp:
+        os.environ["QONIC_API_URL"] = stub.url
+        api = make_api(args.cached)
+        ctx: Dict[str, Any] = {"tmp": tmp}
+        prepare(api, ctx)
+
+        print(f"{'benchmark':<36} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'ops/s':>9} {'peak KiB':>10}")
+        for name, fn in BENCHMARKS.items():
+            if args.filter not in name:
+                continue
+            result = results[name] = measure(fn, api, ctx, args.repeat, args.warmup)
+            print(f"{name:<36} {result['mean_ms']:>9.2f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                  f"{result['ops_per_s']:>9.1f} {result['peak_kib']:>10.0f}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text(encoding="utf-8")), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
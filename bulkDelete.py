@@ -0,0 +1,52 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+DELETED = "deleted"
+NOT_FOUND = "not_found"
+FAILED = "failed"
+
+
+class BulkDeleteResult:
+    # Filled in while the deletes run, so a progress callback can read counts and throughput at any time
+    def __init__(self, total: int):
+        self.total = total
+        self.outcomes: Dict[str, str] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, guid: str, outcome: str, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self.outcomes[guid] = outcome
+            if error is not None:
+                self.errors[guid] = error
+            self.seconds = time.perf_counter() - self.started
+
+    @property
+    def done(self) -> int:
+        return len(self.outcomes)
+
+    @property
+    def per_second(self) -> float:
+        return self.done / self.seconds if self.seconds else 0.0
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {DELETED: 0, NOT_FOUND: 0, FAILED: 0}
+            for outcome in self.outcomes.values():
+                counts[outcome] += 1
+            return counts
+
+    def guids(self, outcome: str) -> List[str]:
+        with self._lock:
+            return [guid for guid, o in self.outcomes.items() if o == outcome]
+
+    def report(self) -> str:
+        counts = self.counts()
+        return (f"{self.done}/{self.total} products in {self.seconds:.2f}s ({self.per_second:.0f}/s): "
+                f"{counts[DELETED]} deleted, {counts[NOT_FOUND]} not found, {counts[FAILED]} failed")
+
+    def __repr__(self) -> str:
+        return f"BulkDeleteResult({self.report()})"
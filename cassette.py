@@ -0,0 +1,221 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+REDACTED = "REDACTED"
+SECRET_HEADERS = frozenset({"authorization", "cookie", "set-cookie", "x-api-key"})
+SECRET_FIELDS = frozenset({"access_token", "refresh_token", "id_token", "client_secret", "code", "code_verifier",
+                           "password"})
+SECRET_QUERY_HINTS = ("signature", "sig", "token", "credential", "key", "secret")
+# Response headers that carry a URL, e.g. the pre-signed storage URL of an export or quantities result
+URL_HEADERS = frozenset({"location", "content-location"})
+# Bodies are stored decoded, so the transfer headers of the original response no longer apply
+DROPPED_RESPONSE_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+class CassetteMiss(LookupError):
+    pass
+
+
+def redact_url(url: str) -> str:
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = [(k, REDACTED if any(h in k.lower() for h in SECRET_QUERY_HINTS) else v)
+             for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def redact_body(body: bytes) -> bytes:
+    try:
+        data = json.loads(body)
+    except ValueError:
+        try:
+            form = parse_qsl(body.decode("ascii"), keep_blank_values=True, strict_parsing=True)
+        except (UnicodeDecodeError, ValueError):
+            return body
+        if not any(k in SECRET_FIELDS for k, _ in form):
+            return body
+        return urlencode([(k, REDACTED if k in SECRET_FIELDS else v) for k, v in form]).encode("ascii")
+    redacted = _redact_json(data)
+    if redacted == data:
+        return body
+    return json.dumps(redacted).encode("utf-8")
+
+
+def _redact_json(data: Any) -> Any:
+    # Secret fields at any depth, and signed query parameters of URL-valued strings such as uploadUrl
+    if isinstance(data, dict):
+        return {k: REDACTED if k in SECRET_FIELDS else _redact_json(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_redact_json(v) for v in data]
+    if isinstance(data, str) and data.startswith(("http://", "https://")):
+        return redact_url(data)
+    return data
+
+
+def redact_headers(headers: Any) -> Dict[str, str]:
+    redacted = {}
+    for k, v in headers.items():
+        name = k.lower()
+        redacted[k] = REDACTED if name in SECRET_HEADERS else redact_url(v) if name in URL_HEADERS else v
+    return redacted
+
+
+def _encode_body(body: bytes) -> Dict[str, str]:
+    try:
+        return {"text": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(entry: Dict[str, str]) -> bytes:
+    if "base64" in entry:
+        return base64.b64decode(entry["base64"])
+    return entry.get("text", "").encode("utf-8")
+
+
+def _request_body(request: requests.PreparedRequest) -> bytes:
+    body = request.body
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if isinstance(body, bytes):
+        return body
+    # Streamed uploads (open files) are matched on method and URL only
+    return b"<stream>"
+
+
+class Cassette:
+    def __init__(self, path: str | Path, mode: str = "replay", replay_timing: bool = False):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode {mode!r}, use 'record' or 'replay'")
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_timing = replay_timing
+        self.interactions: List[Dict[str, Any]] = []
+        self._by_target: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        self._used: set[int] = set()
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self.load()
+
+    @classmethod
+    def from_env(cls) -> Optional["Cassette"]:
+        path = os.getenv("QONIC_CASSETTE")
+        if not path:
+            return None
+        return cls(path, os.getenv("QONIC_CASSETTE_MODE", "replay"), os.getenv("QONIC_CASSETTE_TIMING") == "1")
+
+    @staticmethod
+    def key(method: str, url: str, body: bytes) -> Tuple[str, str, str]:
+        # Matching ignores scheme and host, so a cassette replays against any base URL
+        parts = urlsplit(redact_url(url))
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        return method.upper(), target, hashlib.sha256(redact_body(body)).hexdigest()
+
+    def load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            self.interactions = [json.loads(line) for line in f if line.strip()]
+        self._by_target.clear()
+        self._used.clear()
+        for interaction in self.interactions:
+            request = interaction["request"]
+            self._by_target[(request["method"], request["target"])].append(interaction)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, gzip.open(self.path, "wt", encoding="utf-8", compresslevel=9) as f:
+            for interaction in self.interactions:
+                f.write(json.dumps(interaction, separators=(",", ":")) + "\n")
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response, elapsed: float) -> None:
+        body = _request_body(request)
+        method, target, digest = self.key(request.method, request.url, body)
+        interaction = {
+            "request": {
+                "method": method,
+                "url": redact_url(request.url),
+                "target": target,
+                "headers": redact_headers(request.headers),
+                "body_sha256": digest,
+                "body": _encode_body(redact_body(body)) if body != b"<stream>" else {"text": "<stream>"},
+            },
+            "response": {
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": redact_headers({k: v for k, v in response.headers.items()
+                                           if k.lower() not in DROPPED_RESPONSE_HEADERS}),
+                "body": _encode_body(redact_body(response.content)),
+            },
+            "elapsed": elapsed,
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def play(self, request: requests.PreparedRequest) -> requests.Response:
+        method, target, digest = self.key(request.method, request.url, _request_body(request))
+        with self._lock:
+            candidates = self._by_target.get((method, target))
+            if not candidates:
+                raise CassetteMiss(f"No recorded response for {method} {target}")
+            # Prefer the next unused exchange with the same body; bodies with random values (new
+            # names, generated ratings) fall back to the next unused one for the same URL. Repeated
+            # requests such as operation polls replay in recorded order and the last one sticks.
+            fresh = [c for c in candidates if id(c) not in self._used]
+            interaction = next((c for c in fresh if c["request"]["body_sha256"] == digest), None)
+            if interaction is None:
+                interaction = fresh[0] if fresh else candidates[-1]
+            self._used.add(id(interaction))
+        if self.replay_timing:
+            time.sleep(interaction["elapsed"])
+        recorded = interaction["response"]
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response.reason = recorded["reason"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response._content = _decode_body(recorded["body"])
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.mode == "record":
+            self.save()
+
+
+class CassetteAdapter(BaseAdapter):
+    def __init__(self, cassette: Cassette, adapter: BaseAdapter):
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if self.cassette.mode == "replay":
+            return self.cassette.play(request)
+        started = time.perf_counter()
+        response = self.adapter.send(request, **kwargs)
+        response.content  # read streamed bodies so they can be stored
+        self.cassette.record(request, response, time.perf_counter() - started)
+        return response
+
+    def close(self) -> None:
+        self.adapter.close()
@@ -0,0 +1,219 @@
+import time
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from QonicApiLib import ModificationInputError
+from jsonCodec import JsonCodec, get_codec
+
+ADD = "add"
+UPDATE = "update"
+DELETE = "delete"
+ACTIONS = (ADD, UPDATE, DELETE)
+# A delete followed by an add: sent as the delete, then the add in a later payload of the same session
+REPLACE = "replace"
+
+# Defaults kept well below typical request body limits; one operation is one field of one product
+MAX_OPERATIONS = 5000
+MAX_BYTES = 4 * 1024 * 1024
+
+# Braces, quotes, colons and commas around one guid/value pair in the encoded payload
+_OPERATION_OVERHEAD = 8
+
+
+def _wrapped(value: Any) -> bool:
+    return isinstance(value, dict) and "PropertySet" in value
+
+
+def _keep_property_set(previous: Any, value: Any) -> Any:
+    # An update carries only the value, while the pending add also says which property set it goes into
+    if _wrapped(previous) and not _wrapped(value):
+        return {"PropertySet": previous["PropertySet"], "Value": value}
+    return value
+
+
+def merge(previous: Optional[Tuple[str, Any]], action: str, value: Any) -> Optional[Tuple[str, Any]]:
+    # Folds a new operation on a field of a product into the pending one; None means nothing is left to send
+    if previous is None:
+        return action, value
+    before, pending = previous
+    if before == ADD:
+        if action == DELETE:
+            # Added and removed again before it ever reached the server
+            return None
+        # Still an add of a property that does not exist yet, now with the latest value
+        return ADD, _keep_property_set(pending, value) if action == UPDATE else value
+    if before == DELETE and action == ADD:
+        # The delete does not say which property set the property was in, so the add may move it to another
+        # one: both are sent
+        return REPLACE, value
+    if before == REPLACE:
+        if action == DELETE:
+            return DELETE, None
+        return REPLACE, _keep_property_set(pending, value) if action == UPDATE else value
+    return action, value
+
+
+class Chunk:
+    def __init__(self, index: int, changes: Dict[str, Dict[str, Dict[str, Any]]], operations: int, size: int):
+        self.index = index
+        self.changes = changes
+        self.operations = operations
+        self.bytes = size
+        self.seconds = 0.0
+        self.errors: List[ModificationInputError] = []
+
+    def __repr__(self) -> str:
+        return (f"Chunk({self.index}, operations={self.operations}, bytes={self.bytes}, "
+                f"errors={len(self.errors)}, seconds={self.seconds:.3f})")
+
+
+class ChangeSetResult:
+    def __init__(self, chunks: List[Chunk]):
+        self.chunks = chunks
+        self.session_seconds = 0.0
+        self.publish_seconds = 0.0
+        self.published = False
+        self.seconds = 0.0
+
+    @property
+    def errors(self) -> List[ModificationInputError]:
+        return [e for c in self.chunks for e in c.errors]
+
+    @property
+    def operations(self) -> int:
+        return sum(c.operations for c in self.chunks)
+
+    def report(self) -> str:
+        lines = [f"{'chunk':>5} {'ops':>7} {'bytes':>10} {'errors':>7} {'seconds':>9}"]
+        for c in self.chunks:
+            lines.append(f"{c.index:>5} {c.operations:>7} {c.bytes:>10} {len(c.errors):>7} {c.seconds:>9.3f}")
+        published = f", published in {self.publish_seconds:.3f}s" if self.published else ""
+        lines.append(f"{self.operations} operations in {len(self.chunks)} chunks, {self.seconds:.3f}s "
+                     f"(session start/end {self.session_seconds:.3f}s{published})")
+        return "\n".join(lines)
+
+
+class ChangeSet:
+    # Collects product modifications, keeping only the net operation per field and product
+    def __init__(self, codec: JsonCodec | None = None):
+        self.codec = codec or get_codec()
+        self.operations: Dict[Tuple[str, str], Tuple[str, Any]] = {}
+        self.cancelled = 0
+
+    @classmethod
+    def from_changes(cls, changes: Mapping[str, Any], codec: JsonCodec | None = None) -> "ChangeSet":
+        change_set = cls(codec)
+        change_set.extend(changes)
+        return change_set
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    def __bool__(self) -> bool:
+        return bool(self.operations)
+
+    def _record(self, action: str, field: str, guid: str, value: Any) -> "ChangeSet":
+        key = (field, guid)
+        operation = merge(self.operations.get(key), action, value)
+        if operation is None:
+            del self.operations[key]
+            self.cancelled += 1
+        else:
+            self.operations[key] = operation
+        return self
+
+    def add(self, field: str, guid: str, value: Any, property_set: Optional[str] = None) -> "ChangeSet":
+        if property_set is not None:
+            value = {"PropertySet": property_set, "Value": value}
+        return self._record(ADD, field, guid, value)
+
+    def update(self, field: str, guid: str, value: Any = None) -> "ChangeSet":
+        return self._record(UPDATE, field, guid, value)
+
+    def delete(self, field: str, guid: str) -> "ChangeSet":
+        return self._record(DELETE, field, guid, None)
+
+    def extend(self, changes: Mapping[str, Any]) -> "ChangeSet":
+        # Accepts the modify_products payload format: {"add"|"update"|"delete": {field: {guid: value}}}
+        for action in ACTIONS:
+            for field, products in (changes.get(action) or {}).items():
+                for guid, value in (products or {}).items():
+                    self._record(action, field, guid, value)
+        return self
+
+    def clear(self) -> None:
+        self.operations.clear()
+        self.cancelled = 0
+
+    def _phases(self) -> List[List[Tuple[str, str, str, Any]]]:
+        # Replaced properties are deleted with the other operations and added back once all of those are sent
+        operations, readded = [], []
+        for (field, guid), (action, value) in self.operations.items():
+            if action == REPLACE:
+                operations.append((DELETE, field, guid, None))
+                readded.append((ADD, field, guid, value))
+            else:
+                operations.append((action, field, guid, value))
+        return [operations, readded] if readded else [operations]
+
+    def to_changes(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        # One payload, so a replaced property is in both "delete" and "add"; chunks() keeps them apart
+        changes: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for phase in self._phases():
+            for action, field, guid, value in phase:
+                changes.setdefault(action, {}).setdefault(field, {})[guid] = value
+        return changes
+
+    def chunks(self, max_operations: int = MAX_OPERATIONS, max_bytes: int = MAX_BYTES) -> Iterator[Chunk]:
+        # Sizes are estimated per operation from its encoded guid, field and value, not by encoding every chunk.
+        # A chunk never spans two phases, so a replaced property is deleted before it is added back.
+        dumps = self.codec.dumps
+        index = 0
+        for phase in self._phases():
+            changes: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            operations = size = 0
+            for action, field, guid, value in phase:
+                cost = len(dumps(value)) + len(guid.encode("utf-8")) + len(field.encode("utf-8")) + _OPERATION_OVERHEAD
+                if operations and (operations >= max_operations or size + cost > max_bytes):
+                    yield Chunk(index, changes, operations, size)
+                    changes = {}
+                    operations = size = 0
+                    index += 1
+                changes.setdefault(action, {}).setdefault(field, {})[guid] = value
+                operations += 1
+                size += cost
+            if operations:
+                yield Chunk(index, changes, operations, size)
+                index += 1
+
+    def submit(self, api: Any, project_id: str, model_id: str, publish: bool = False, title: Optional[str] = None,
+               description: Optional[str] = None, max_operations: int = MAX_OPERATIONS,
+               max_bytes: int = MAX_BYTES, open_session: bool = True) -> ChangeSetResult:
+        # All chunks go through one modification session; publishing is skipped when the server rejected anything.
+        # With open_session=False the chunks are sent in the session the caller already has open.
+        started = time.perf_counter()
+        result = ChangeSetResult(list(self.chunks(max_operations, max_bytes)))
+        if not result.chunks and not publish:
+            return result
+        if open_session:
+            session_started = time.perf_counter()
+            api.start_session(project_id, model_id)
+            result.session_seconds = time.perf_counter() - session_started
+        try:
+            for chunk in result.chunks:
+                chunk_started = time.perf_counter()
+                try:
+                    chunk.errors = api.modify_products(project_id, model_id, chunk.changes)
+                finally:
+                    chunk.seconds = time.perf_counter() - chunk_started
+            if publish and not result.errors:
+                publish_started = time.perf_counter()
+                api.publish_changes(project_id, model_id, title, description)
+                result.publish_seconds = time.perf_counter() - publish_started
+                result.published = True
+        finally:
+            if open_session:
+                session_ended = time.perf_counter()
+                api.end_session(project_id, model_id)
+                result.session_seconds += time.perf_counter() - session_ended
+            result.seconds = time.perf_counter() - started
+        return result
@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlencode
+
+
+class Validators:
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], body: Any):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = body
+
+    def request_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ValidatorCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Validators] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, params: Mapping[str, Any] | None = None) -> str:
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()), doseq=True)}"
+
+    def get(self, key: str) -> Optional[Validators]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key: str, headers: Mapping[str, str], body: Any) -> None:
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        with self._lock:
+            if not etag and not last_modified:
+                self._entries.pop(key, None)
+                return
+            self._entries[key] = Validators(etag, last_modified, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class CachePolicy:
+    # max_bytes bounds a family by the encoded size of its responses; None counts entries only
+    def __init__(self, ttl: float = 60.0, max_entries: int = 128, max_bytes: Optional[int] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+
+DEFAULT_POLICIES: Dict[str, CachePolicy] = {
+    "projects": CachePolicy(ttl=300),
+    "models": CachePolicy(ttl=60),
+    "product_fields": CachePolicy(ttl=300),
+    "products": CachePolicy(ttl=60, max_entries=8, max_bytes=32 * 1024 * 1024),
+    "codifications": CachePolicy(),
+    "custom_properties": CachePolicy(),
+    "materials": CachePolicy(),
+    "locations": CachePolicy(),
+    "types": CachePolicy(),
+}
+
+
+class _Family:
+    def __init__(self, policy: CachePolicy):
+        self.policy = policy
+        self.entries: OrderedDict[tuple, tuple[float, Any, int]] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+
+class ResponseCache:
+    # Keys are tuples that start with the project id (and model id where relevant), so a
+    # mutation can drop every entry below it with a key prefix.
+    def __init__(self, policies: Mapping[str, CachePolicy] | None = None, clock=time.monotonic):
+        merged = dict(DEFAULT_POLICIES)
+        merged.update(policies or {})
+        self._families = {name: _Family(policy) for name, policy in merged.items()}
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def configure(self, family: str, policy: CachePolicy) -> None:
+        with self._lock:
+            self._families[family] = _Family(policy)
+
+    def get(self, family: str, key: tuple) -> tuple[bool, Any]:
+        with self._lock:
+            fam = self._families.get(family)
+            if fam is None or not fam.policy.enabled:
+                return False, None
+            entry = fam.entries.get(key)
+            if entry is not None and entry[0] < self._clock():
+                del fam.entries[key]
+                fam.bytes -= entry[2]
+                fam.expirations += 1
+                entry = None
+            if entry is None:
+                fam.misses += 1
+                return False, None
+            fam.entries.move_to_end(key)
+            fam.hits += 1
+            return True, entry[1]
+
+    def put(self, family: str, key: tuple, value: Any, size: int = 0) -> None:
+        # Cached values are shared with every later hit, so callers must treat them as read-only
+        with self._lock:
+            fam = self._families.get(family)
+            if fam is None or not fam.policy.enabled:
+                return
+            max_bytes = fam.policy.max_bytes
+            previous = fam.entries.pop(key, None)
+            if previous is not None:
+                fam.bytes -= previous[2]
+            if max_bytes is not None and size > max_bytes:
+                return
+            fam.entries[key] = (self._clock() + fam.policy.ttl, value, size)
+            fam.bytes += size
+            while len(fam.entries) > fam.policy.max_entries or (max_bytes is not None and fam.bytes > max_bytes):
+                _, (_, _, evicted) = fam.entries.popitem(last=False)
+                fam.bytes -= evicted
+                fam.evictions += 1
+
+    def invalidate(self, family: str, *prefix: Any) -> None:
+        with self._lock:
+            fam = self._families.get(family)
+            if fam is None:
+                return
+            stale = [key for key in fam.entries if key[:len(prefix)] == prefix]
+            for key in stale:
+                fam.bytes -= fam.entries.pop(key)[2]
+            fam.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            for fam in self._families.values():
+                fam.entries.clear()
+                fam.bytes = 0
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                name: {
+                    "entries": len(fam.entries),
+                    "bytes": fam.bytes,
+                    "hits": fam.hits,
+                    "misses": fam.misses,
+                    "evictions": fam.evictions,
+                    "expirations": fam.expirations,
+                    "invalidations": fam.invalidations,
+                }
+                for name, fam in self._families.items()
+            }
@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Every path segment that is not one of these is an identifier and becomes {id} in the endpoint template
+STATIC_SEGMENTS = frozenset({
+    "projects", "models", "products", "properties", "query", "available-data", "quantities", "result",
+    "operations", "start-session", "end-session", "publish", "discard", "upload-url", "export-ifc",
+    "codifications", "codification", "customProperties", "property-sets", "property", "material-libraries",
+    "materials", "locations", "types", "auth", "token",
+})
+
+
+def endpoint_template(path: str) -> str:
+    path = path.split("?", 1)[0].strip("/")
+    return "/".join(s if s in STATIC_SEGMENTS else "{id}" for s in path.split("/"))
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((repr(bound), total))
+        result.append(("+Inf", self.count))
+        return result
+
+
+class RequestRecord:
+    def __init__(self, method: str, path: str, request_bytes: int, attempt: int):
+        self.method = method
+        self.path = path
+        self.endpoint = endpoint_template(path)
+        self.request_bytes = request_bytes
+        self.attempt = attempt
+        self.start_time = time.time_ns()
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.status: Optional[int] = None
+        self.response_bytes = 0
+        self.error: Optional[BaseException] = None
+
+
+class _EndpointMetrics:
+    def __init__(self):
+        self.latency = Histogram()
+        self.decode = Histogram()
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.retries = 0
+        self.errors = 0
+        self.statuses: Dict[int, int] = defaultdict(int)
+
+
+class Instrumentation:
+    def __init__(self, span_path: str | Path | None = None, service_name: str = "qonic-api-client"):
+        self.span_path = Path(span_path) if span_path else None
+        self.service_name = service_name
+        self.pre_hooks: List[Callable[[RequestRecord], None]] = []
+        self.post_hooks: List[Callable[[RequestRecord], None]] = []
+        self._metrics: Dict[Tuple[str, str], _EndpointMetrics] = defaultdict(_EndpointMetrics)
+        self._lock = threading.Lock()
+
+    def add_pre_hook(self, hook: Callable[[RequestRecord], None]) -> None:
+        self.pre_hooks.append(hook)
+
+    def add_post_hook(self, hook: Callable[[RequestRecord], None]) -> None:
+        self.post_hooks.append(hook)
+
+    def start(self, method: str, path: str, request_bytes: int = 0, attempt: int = 0) -> RequestRecord:
+        record = RequestRecord(method, path, request_bytes, attempt)
+        for hook in self.pre_hooks:
+            hook(record)
+        return record
+
+    def finish(self, record: RequestRecord, status: Optional[int] = None, response_bytes: int = 0,
+               error: Optional[BaseException] = None) -> None:
+        record.duration = time.perf_counter() - record.started
+        record.status = status
+        record.response_bytes = response_bytes
+        record.error = error
+        with self._lock:
+            metrics = self._metrics[(record.method, record.endpoint)]
+            metrics.latency.observe(record.duration)
+            metrics.request_bytes += record.request_bytes
+            metrics.response_bytes += response_bytes
+            if status is not None:
+                metrics.statuses[status] += 1
+            if error is not None:
+                metrics.errors += 1
+            if record.attempt:
+                metrics.retries += 1
+        for hook in self.post_hooks:
+            hook(record)
+        if self.span_path is not None:
+            self._write_span(record)
+
+    def record_decode(self, method: str, path: str, seconds: float) -> None:
+        with self._lock:
+            self._metrics[(method, endpoint_template(path))].decode.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                f"{method} {endpoint}": {
+                    "count": m.latency.count,
+                    "latency_sum": m.latency.sum,
+                    "decode_sum": m.decode.sum,
+                    "request_bytes": m.request_bytes,
+                    "response_bytes": m.response_bytes,
+                    "retries": m.retries,
+                    "errors": m.errors,
+                    "statuses": dict(m.statuses),
+                }
+                for (method, endpoint), m in self._metrics.items()
+            }
+
+    def prometheus(self) -> str:
+        lines = []
+
+        def histogram(name: str, help_text: str, attr: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, endpoint), m in items:
+                h = getattr(m, attr)
+                labels = f'method="{method}",endpoint="{endpoint}"'
+                for bound, count in h.cumulative():
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {h.sum}")
+                lines.append(f"{name}_count{{{labels}}} {h.count}")
+
+        def counter(name: str, help_text: str, value: Callable[[_EndpointMetrics], int]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (method, endpoint), m in items:
+                lines.append(f'{name}{{method="{method}",endpoint="{endpoint}"}} {value(m)}')
+
+        with self._lock:
+            items = sorted(self._metrics.items())
+            histogram("qonic_request_duration_seconds", "Network time per request attempt", "latency")
+            histogram("qonic_decode_duration_seconds", "Time spent decoding JSON response bodies", "decode")
+            counter("qonic_request_bytes_total", "Request body bytes sent", lambda m: m.request_bytes)
+            counter("qonic_response_bytes_total", "Response body bytes received", lambda m: m.response_bytes)
+            counter("qonic_retries_total", "Request attempts that were retries", lambda m: m.retries)
+            counter("qonic_errors_total", "Request attempts that raised a transport error", lambda m: m.errors)
+            lines.append("# HELP qonic_responses_total Responses by status code")
+            lines.append("# TYPE qonic_responses_total counter")
+            for (method, endpoint), m in items:
+                for status, count in sorted(m.statuses.items()):
+                    lines.append(f'qonic_responses_total{{method="{method}",endpoint="{endpoint}",status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str | Path) -> None:
+        Path(path).write_text(self.prometheus(), encoding="utf-8")
+
+    def _write_span(self, record: RequestRecord) -> None:
+        # One OTLP/JSON ExportTraceServiceRequest per line, the format of the OpenTelemetry file exporter
+        attributes = {
+            "http.request.method": record.method,
+            "url.path": record.path,
+            "http.route": record.endpoint,
+            "http.request.body.size": record.request_bytes,
+            "http.response.body.size": record.response_bytes,
+            "http.request.resend_count": record.attempt,
+        }
+        if record.status is not None:
+            attributes["http.response.status_code"] = record.status
+        if record.error is not None:
+            attributes["error.type"] = type(record.error).__name__
+        failed = record.error is not None or (record.status or 0) >= 500
+        span = {
+            "traceId": os.urandom(16).hex(),
+            "spanId": os.urandom(8).hex(),
+            "name": f"{record.method} {record.endpoint}",
+            "kind": 3,
+            "startTimeUnixNano": str(record.start_time),
+            "endTimeUnixNano": str(record.start_time + int(record.duration * 1e9)),
+            "attributes": [{"key": k, "value": _otel_value(v)} for k, v in attributes.items()],
+            "status": {"code": 2 if failed else 1},
+        }
+        line = json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "qonic-api"}, "spans": [span]}],
+            }]
+        })
+        with self._lock:
+            with open(self.span_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def _otel_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    return {"stringValue": str(value)}
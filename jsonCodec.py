@@ -0,0 +1,62 @@
+import json
+import os
+from typing import Any, Callable, Dict, List
+
+
+class JsonCodec:
+    def __init__(self, name: str, dumps: Callable[[Any], bytes], loads: Callable[[bytes | str], Any]):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self) -> str:
+        return f"JsonCodec({self.name})"
+
+
+def _orjson() -> JsonCodec:
+    import orjson
+    return JsonCodec("orjson", orjson.dumps, orjson.loads)
+
+
+def _ujson() -> JsonCodec:
+    import ujson
+
+    def dumps(obj: Any) -> bytes:
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+
+    return JsonCodec("ujson", dumps, ujson.loads)
+
+
+def _stdlib() -> JsonCodec:
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(obj: Any) -> bytes:
+        return encoder.encode(obj).encode("utf-8")
+
+    return JsonCodec("json", dumps, json.loads)
+
+
+CODECS: Dict[str, Callable[[], JsonCodec]] = {
+    "orjson": _orjson,
+    "ujson": _ujson,
+    "json": _stdlib,
+}
+
+
+def available_codecs() -> List[JsonCodec]:
+    codecs = []
+    for factory in CODECS.values():
+        try:
+            codecs.append(factory())
+        except ImportError:
+            pass
+    return codecs
+
+
+def get_codec(name: str | None = None) -> JsonCodec:
+    name = name or os.getenv("QONIC_JSON_CODEC")
+    if name:
+        if name not in CODECS:
+            raise ValueError(f"Unknown JSON codec {name!r}, choose one of {', '.join(CODECS)}")
+        return CODECS[name]()
+    return available_codecs()[0]
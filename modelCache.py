@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REVISION_KEYS = ("revision", "revisionId", "version", "versionId", "lastModified", "modifiedAt", "updatedAt")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    project_id TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    revision TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    request_hash TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (project_id, model_id, kind, request_hash)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+"""
+
+
+def default_path() -> Path:
+    return Path(os.getenv("QONIC_CACHE_PATH", Path.home() / ".cache" / "qonic" / "models.sqlite"))
+
+
+def model_revision(model: Dict[str, Any]) -> str:
+    for key in REVISION_KEYS:
+        if model.get(key) is not None:
+            return f"{key}:{model[key]}"
+    # Without an explicit revision any change in the model metadata counts as a new revision
+    digest = hashlib.sha256(json.dumps(model, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"meta:{digest[:32]}"
+
+
+def request_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class ModelCache:
+    def __init__(self, path: str | Path | None = None, max_bytes: int = 512 * 1024 * 1024):
+        self.path = Path(path) if path else default_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        import sqlite3
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def get(self, project_id: str, model_id: str, revision: str, kind: str, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body FROM entries WHERE project_id=? AND model_id=? AND kind=? AND request_hash=? AND revision=?",
+                (project_id, model_id, kind, key, revision),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute(
+                "UPDATE entries SET accessed_at=? WHERE project_id=? AND model_id=? AND kind=? AND request_hash=?",
+                (time.time(), project_id, model_id, kind, key),
+            )
+            return zlib.decompress(row[0])
+
+    def put(self, project_id: str, model_id: str, revision: str, kind: str, key: str, body: bytes) -> None:
+        compressed = zlib.compress(body, 6)
+        if len(compressed) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                # Entries of older revisions can never be served again
+                self._db.execute(
+                    "DELETE FROM entries WHERE project_id=? AND model_id=? AND revision<>?",
+                    (project_id, model_id, revision),
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (project_id, model_id, revision, kind, key, compressed, len(compressed), now, now),
+                )
+                self._evict()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT rowid, size FROM entries ORDER BY accessed_at").fetchall()
+        stale = []
+        for rowid, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((rowid,))
+            total -= size
+        self._db.executemany("DELETE FROM entries WHERE rowid=?", stale)
+
+    def invalidate(self, project_id: str | None = None, model_id: str | None = None) -> int:
+        clauses, params = [], []
+        if project_id is not None:
+            clauses.append("project_id=?")
+            params.append(project_id)
+        if model_id is not None:
+            clauses.append("model_id=?")
+            params.append(model_id)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return self._db.execute(f"DELETE FROM entries{where}", params).rowcount
+
+    def entries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT project_id, model_id, revision, kind, request_hash, size, created_at, accessed_at "
+                "FROM entries ORDER BY accessed_at DESC"
+            ).fetchall()
+        keys = ("project_id", "model_id", "revision", "kind", "request_hash", "size", "created_at", "accessed_at")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            "path": str(self.path),
+            "entries": count,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or clear the on-disk Qonic model cache")
+    parser.add_argument("--path", help=f"cache file (default {default_path()})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="show size and entry count")
+    commands.add_parser("list", help="list cached entries")
+    clear = commands.add_parser("clear", help="remove entries")
+    clear.add_argument("--project")
+    clear.add_argument("--model")
+    args = parser.parse_args()
+
+    cache = ModelCache(args.path)
+    if args.command == "stats":
+        for key, value in cache.stats().items():
+            if key not in ("hits", "misses"):
+                print(f"{key}: {value}")
+    elif args.command == "list":
+        for entry in cache.entries():
+            accessed = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["accessed_at"]))
+            print(f"{entry['project_id']} {entry['model_id']} {entry['kind']:<8} {entry['revision']} "
+                  f"{entry['request_hash'][:12]} {entry['size']:>10} bytes  last used {accessed}")
+    elif args.command == "clear":
+        removed = cache.invalidate(args.project, args.model)
+        print(f"Removed {removed} entries")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
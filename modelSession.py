@@ -0,0 +1,79 @@
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from QonicApiLib import ModificationInputError, ProductFilter
+
+
+class ModelSession:
+    # A modification session on one model. It sends its own X-Client-Session-Id through a client that shares
+    # the connection pool, caches and tokens of the QonicApi it came from, so sessions on different models can
+    # run side by side from worker threads. Use one ModelSession per thread.
+    def __init__(self, client: Any, project_id: str, model_id: str):
+        self.client = client
+        self.project_id = project_id
+        self.model_id = model_id
+        self.active = False
+        self.requests = 0
+        self.started_at: Optional[float] = None
+        self.seconds = 0.0
+
+    @property
+    def session_id(self) -> str:
+        return self.client.session_id
+
+    def __enter__(self) -> "ModelSession":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.end()
+
+    def __repr__(self) -> str:
+        state = "active" if self.active else "closed"
+        return f"ModelSession({self.project_id}/{self.model_id}, {self.session_id}, {state}, requests={self.requests})"
+
+    def start(self) -> "ModelSession":
+        if self.active:
+            return self
+        self.client.start_session(self.project_id, self.model_id, self.session_id)
+        self.active = True
+        self.started_at = time.perf_counter()
+        return self
+
+    def end(self) -> None:
+        if not self.active:
+            return
+        try:
+            self.client.end_session(self.project_id, self.model_id)
+        finally:
+            self.active = False
+            self.seconds = time.perf_counter() - self.started_at
+
+    def _call(self, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if not self.active:
+            raise RuntimeError(f"Modification session on model {self.model_id} is not active")
+        self.requests += 1
+        return method(self.project_id, self.model_id, *args, **kwargs)
+
+    def query_products(self, fields: Iterable[str], filters: Iterable[ProductFilter] | None = None) -> Any:
+        return self._call(self.client.query_products, fields, filters)
+
+    def modify_products(self, changes: Dict[str, Any]) -> List[ModificationInputError]:
+        return self._call(self.client.modify_products, changes)
+
+    def delete_product(self, guid: str) -> None:
+        self._call(self.client.delete_product, guid)
+
+    def delete_products(self, guids: Iterable[str] | None = None, filters: Iterable[ProductFilter] | None = None,
+                        **kwargs: Any) -> Any:
+        return self._call(self.client.delete_products, guids, filters, **kwargs)
+
+    def submit(self, change_set: Any, **kwargs: Any) -> Any:
+        # Sends a ChangeSet in this session instead of opening one of its own
+        return self._call(lambda p, m: change_set.submit(self.client, p, m, open_session=False, **kwargs))
+
+    def publish_changes(self, title: Optional[str] = None, description: Optional[str] = None) -> None:
+        self._call(self.client.publish_changes, title, description)
+
+    def discard_changes(self) -> None:
+        self._call(self.client.discard_changes)
@@ -0,0 +1,121 @@
+import base64
+import hashlib
+import http.server
+import secrets
+import string
+import threading
+import urllib.parse
+import webbrowser
+import requests
+
+import oauth
+
+# --- PKCE helpers ------------------------------------------------------------
+
+_ALPHABET = string.ascii_letters + string.digits + "-._~"  # RFC 7636 allowed chars
+
+def make_code_verifier(length: int = 64) -> str:
+    # RFC 7636: 43–128 chars from allowed set
+    return ''.join(secrets.choice(_ALPHABET) for _ in range(length))
+
+def b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def make_code_challenge(verifier: str) -> str:
+    digest = hashlib.sha256(verifier.encode('ascii')).digest()
+    return b64url(digest)
+
+def make_state(length: int = 24) -> str:
+    return ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(length))
+
+# --- Local callback server ---------------------------------------------------
+
+class OAuthHandler(http.server.BaseHTTPRequestHandler):
+    result = {}
+
+    def do_GET(self):
+        parsed = urllib.parse.urlparse(self.path)
+        if parsed.path != "/callback":
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        qs = urllib.parse.parse_qs(parsed.query)
+        OAuthHandler.result["code"] = qs.get("code", [None])[0]
+        OAuthHandler.result["state"] = qs.get("state", [None])[0]
+        OAuthHandler.result["error"] = qs.get("error", [None])[0]
+
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"<h3>Qonic OAuth completed. You can close this tab.</h3>")
+
+    def log_message(self, fmt, *args):
+        return
+
+def run_local_server():
+    server = http.server.HTTPServer(("127.0.0.1", int(oauth.settings()["LOCAL_PORT"])), OAuthHandler)
+    thread = threading.Thread(target=server.handle_request)
+    thread.start()
+    thread.join()
+    server.server_close()
+    return OAuthHandler.result
+
+# --- Main login flow (now with PKCE) ----------------------------------------
+
+def login() -> dict:
+    config = oauth.settings()
+
+    # 1) Prepare PKCE + state
+    code_verifier = make_code_verifier(64)
+    code_challenge = make_code_challenge(code_verifier)
+    state = make_state(24)
+
+    # 2) Open authorize URL (with PKCE + state)
+    params = {
+        "client_id": config["CLIENT_ID"],
+        "scope": config["SCOPE"],
+        "redirect_uri": config["REDIRECT_URI"],
+        "state": state,
+        "code_challenge": code_challenge,
+        "code_challenge_method": "S256",
+    }
+    url = f"{config['API_URL']}/auth/authorize?{urllib.parse.urlencode(params)}"
+    print("Open this URL to authorize:")
+    print(url)
+    webbrowser.open(url)
+
+    # 3) Wait for the local redirect
+    result = run_local_server()
+    if result.get("error"):
+        raise SystemExit(f"Authorization failed: {result['error']}")
+
+    # Verify state to prevent CSRF
+    returned_state = result.get("state")
+    if not returned_state or returned_state != state:
+        raise SystemExit("Invalid state returned from Qonic (possible CSRF).")
+
+    code = result.get("code")
+    if not code:
+        raise SystemExit("No code received from Qonic!")
+
+    # 4) Exchange code for tokens (include codeVerifier)
+    result = requests.post(
+        f"{config['API_URL']}/auth/token",
+        data={
+            "client_id": config["CLIENT_ID"],
+            "client_secret": config["CLIENT_SECRET"],
+            "code": code,
+            "redirect_uri": config["REDIRECT_URI"],
+            "code_verifier": code_verifier,
+            "grant_type": "authorization_code"
+        },
+        timeout=30,
+    ).json()
+
+    if 'errorDetails' in result:
+        raise SystemExit(f"Token exchange failed: {result['errorDetails']}")
+
+    if 'access_token' not in result:
+        raise SystemExit("No access token received from Qonic!")
+
+    return result
@@ -0,0 +1,51 @@
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def prefetch(loads: Iterable[Callable[[], T]], depth: int = 2) -> Iterator[T]:
+    # Runs the loads in order on a background thread, at most `depth` results ahead of the consumer
+    results: "queue.Queue[object]" = queue.Queue(maxsize=max(depth, 1))
+    stopped = threading.Event()
+
+    def put(item: object) -> bool:
+        while not stopped.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for load in loads:
+                if stopped.is_set() or not put(load()):
+                    return
+        except BaseException as e:
+            put(_Failure(e))
+            return
+        put(_DONE)
+
+    worker = threading.Thread(target=produce, name="qonic-prefetch", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        # Also reached when the consumer stops early; the producer exits after its current load
+        stopped.set()
@@ -0,0 +1,268 @@
+import csv
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from QonicApiLib import ProductFilter
+from jsonCodec import JsonCodec, get_codec
+
+FORMATS = {".parquet": "parquet", ".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+EXTENSIONS = {"parquet": ".parquet", "csv": ".csv", "jsonl": ".jsonl"}
+
+# Rows held in memory at once; one Parquet row group, or one batch of CSV/JSON Lines writes
+ROW_GROUP_SIZE = 50000
+
+
+def _nested(cell: Any) -> bool:
+    return isinstance(cell, dict) and "Value" in cell
+
+
+class ExportResult:
+    def __init__(self, model_id: str, path: Path, format: str):
+        self.model_id = model_id
+        self.path = path
+        self.format = format
+        self.rows = 0
+        self.row_groups = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.error: Optional[BaseException] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __repr__(self) -> str:
+        return (f"ExportResult({self.model_id}, {self.format}, rows={self.rows}, row_groups={self.row_groups}, "
+                f"bytes={self.bytes}, seconds={self.seconds:.3f})")
+
+
+class JsonLinesWriter:
+    def __init__(self, path: Path, fields: List[str], codec: JsonCodec | None = None):
+        self.fields = fields
+        self.codec = codec or get_codec()
+        self.file = open(path, "wb")
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        dumps = self.codec.dumps
+        self.file.write(b"".join(dumps(row) + b"\n" for row in rows))
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class CsvWriter:
+    # Fields returned as {"PropertySet": ..., "Value": ...} get two columns, "<field>" and "<field>.PropertySet"
+    def __init__(self, path: Path, fields: List[str], codec: JsonCodec | None = None):
+        self.fields = fields
+        self.codec = codec or get_codec()
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.nested: Optional[List[bool]] = None
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if self.nested is None:
+            # The first row group decides the columns, so the header is written once
+            self.nested = [any(_nested(row.get(f)) for row in rows) for f in self.fields]
+            header = []
+            for field, nested in zip(self.fields, self.nested):
+                header += [field, f"{field}.PropertySet"] if nested else [field]
+            self.writer.writerow(header)
+        self.writer.writerows(self._line(row) for row in rows)
+
+    def _line(self, row: Dict[str, Any]) -> List[Any]:
+        line = []
+        for field, nested in zip(self.fields, self.nested):
+            cell = row.get(field)
+            if nested:
+                line += [cell.get("Value"), cell.get("PropertySet")] if isinstance(cell, dict) else [cell, None]
+            elif isinstance(cell, (dict, list)):
+                line.append(self.codec.dumps(cell).decode("utf-8"))
+            else:
+                line.append(cell)
+        return line
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ParquetWriter:
+    # Nested fields become struct<PropertySet: dictionary<string>, Value>, so each property-set name is stored once
+    def __init__(self, path: Path, fields: List[str], codec: JsonCodec | None = None, schema: Any = None,
+                 compression: str = "zstd"):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from e
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.fields = fields
+        self.schema = schema
+        self.compression = compression
+        self.writer = None
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        pa = self.pa
+        if self.schema is None:
+            # Inferred from the first row group; pass schema= when later groups may hold other types
+            self.schema = pa.schema([pa.field(f, self._infer([row.get(f) for row in rows])) for f in self.fields])
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        columns = [self._column([row.get(f.name) for row in rows], f.type) for f in self.schema]
+        try:
+            table = pa.Table.from_arrays(columns, schema=self.schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"Row group does not match the Parquet schema: {e}") from e
+        self.writer.write_table(table, row_group_size=len(rows))
+
+    def _infer(self, cells: List[Any]) -> Any:
+        pa = self.pa
+        if any(_nested(c) for c in cells):
+            values = [c.get("Value") if isinstance(c, dict) else c for c in cells]
+            return pa.struct([("PropertySet", pa.dictionary(pa.int32(), pa.string())),
+                              ("Value", self._value_type(values))])
+        return self._value_type(cells)
+
+    def _value_type(self, values: List[Any]) -> Any:
+        pa = self.pa
+        try:
+            value_type = pa.array(values).type
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return pa.string()
+        if pa.types.is_null(value_type):
+            return pa.string()
+        # Numbers are stored as double: a first row group of whole numbers says nothing about the rows after it
+        return pa.float64() if pa.types.is_integer(value_type) else value_type
+
+    def _array(self, values: List[Any], value_type: Any) -> Any:
+        pa = self.pa
+        if pa.types.is_string(value_type):
+            # Values of mixed types, or null in the row group the type was inferred from, are stored as text
+            values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+        # pyarrow truncates 200.5 into an integer column and turns True into 1.0 even with safe=True
+        if pa.types.is_integer(value_type):
+            lossy = next((v for v in values if v is not None and (isinstance(v, bool) or not isinstance(v, int))), None)
+        elif pa.types.is_floating(value_type):
+            lossy = next((v for v in values if isinstance(v, bool)), None)
+        else:
+            lossy = None
+        if lossy is not None:
+            raise pa.ArrowInvalid(f"Could not convert {lossy!r} to {value_type} without losing data")
+        return pa.array(values, value_type, from_pandas=False, safe=True)
+
+    def _column(self, cells: List[Any], column_type: Any) -> Any:
+        pa = self.pa
+        try:
+            if pa.types.is_struct(column_type):
+                psets = [c.get("PropertySet") if isinstance(c, dict) else None for c in cells]
+                values = [c.get("Value") if isinstance(c, dict) else c for c in cells]
+                value_type = column_type.field("Value").type
+                return pa.StructArray.from_arrays(
+                    [pa.array(psets, pa.string()).dictionary_encode(), self._array(values, value_type)],
+                    fields=list(column_type))
+            return self._array(cells, column_type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"Row group does not match the Parquet schema: {e}") from e
+
+    def close(self) -> None:
+        if self.writer is None:
+            # No rows: still write a valid, empty file
+            self.writer = self.pq.ParquetWriter(self.path, self.schema or self.pa.schema(
+                [self.pa.field(f, self.pa.string()) for f in self.fields]), compression=self.compression)
+        self.writer.close()
+
+
+WRITERS = {"parquet": ParquetWriter, "csv": CsvWriter, "jsonl": JsonLinesWriter}
+
+
+def export_format(path: str | Path, format: str | None = None) -> str:
+    if format is None:
+        format = FORMATS.get(Path(path).suffix.lower())
+        if format is None:
+            raise ValueError(f"Cannot tell the export format from {str(path)!r}, pass one of {', '.join(WRITERS)}")
+    if format not in WRITERS:
+        raise ValueError(f"Unknown export format {format!r}, choose one of {', '.join(WRITERS)}")
+    return format
+
+
+def export_products(
+        api: Any,
+        project_id: str,
+        model_id: str,
+        fields: Iterable[str],
+        path: str | Path,
+        filters: Iterable[ProductFilter] | None = None,
+        format: str | None = None,
+        row_group_size: int = ROW_GROUP_SIZE,
+        **writer_options: Any,
+) -> ExportResult:
+    started = time.perf_counter()
+    path = Path(path)
+    fields = list(fields)
+    result = ExportResult(model_id, path, export_format(path, format))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Written next to the target and renamed at the end, so a failed export leaves no truncated file behind
+    partial = path.with_name(path.name + ".partial")
+    writer = WRITERS[result.format](partial, fields, codec=api.codec, **writer_options)
+    try:
+        rows: List[Dict[str, Any]] = []
+        for row in api.query_products_stream(project_id, model_id, fields, filters):
+            rows.append(row)
+            if len(rows) >= row_group_size:
+                writer.write(rows)
+                result.rows += len(rows)
+                result.row_groups += 1
+                rows = []
+        if rows:
+            writer.write(rows)
+            result.rows += len(rows)
+            result.row_groups += 1
+        writer.close()
+    except BaseException:
+        writer.close()
+        partial.unlink(missing_ok=True)
+        raise
+    os.replace(partial, path)
+    result.bytes = path.stat().st_size
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def export_models(
+        api: Any,
+        project_id: str,
+        model_ids: Iterable[str],
+        fields: Iterable[str],
+        directory: str | Path,
+        filters: Iterable[ProductFilter] | None = None,
+        format: str = "parquet",
+        row_group_size: int = ROW_GROUP_SIZE,
+        max_workers: int = 4,
+        **writer_options: Any,
+) -> List[ExportResult]:
+    # One file per model in a Hive-style partition directory: <directory>/model_id=<id>/part-0.<ext>
+    fields = list(fields)
+    filters = list(filters or [])
+    extension = EXTENSIONS[export_format("", format)]
+
+    def run(model_id: str) -> ExportResult:
+        path = Path(directory) / f"model_id={model_id}" / f"part-0{extension}"
+        started = time.perf_counter()
+        try:
+            return export_products(api, project_id, model_id, fields, path, filters, format, row_group_size,
+                                   **writer_options)
+        except Exception as e:
+            result = ExportResult(model_id, path, format)
+            result.error = e
+            result.seconds = time.perf_counter() - started
+            return result
+
+    model_ids = list(model_ids)
+    if not model_ids:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(model_ids)), thread_name_prefix="qonic-export") as pool:
+        return list(pool.map(run, model_ids))
@@ -0,0 +1,155 @@
+import bisect
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from QonicApiLib import ProductFilter
+from productTable import NUMBER, Column, ProductTable, matches, np
+
+HASH_FIELDS = ("Guid", "Class", "Name")
+RANGE_OPERATORS = frozenset({"GreaterThan", "GreaterThanOrEquals", "LessThan", "LessThanOrEquals"})
+# Below this many candidate rows the remaining filters are checked row by row instead of over whole columns
+SCAN_CANDIDATES = 4096
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _rows(indices: Iterable[int]) -> List[int]:
+    return sorted(set(indices))
+
+
+def _intersect(a: List[int], b: List[int]) -> List[int]:
+    if len(a) > len(b):
+        a, b = b, a
+    keep = set(b)
+    return [i for i in a if i in keep]
+
+
+class _HashIndex:
+    # Value -> row numbers; unique values (Guid) keep a single int instead of a list per product
+    def __init__(self, column: Column):
+        self.first: Dict[Any, int] = {}
+        self.more: Dict[Any, List[int]] = {}
+        for i in range(len(column)):
+            value = column.value(i)
+            first = self.first.setdefault(value, i)
+            if first != i:
+                self.more.setdefault(value, [first]).append(i)
+
+    def __len__(self) -> int:
+        return len(self.first)
+
+    def get(self, value: Any) -> List[int]:
+        try:
+            more = self.more.get(value)
+            if more is not None:
+                return more
+            first = self.first.get(value)
+        except TypeError:
+            return []
+        return [] if first is None else [first]
+
+    def values(self) -> Iterable[Any]:
+        return self.first.keys()
+
+
+class _SortedIndex:
+    # Row numbers of the present values, ordered by value, for range and equality lookups by bisection
+    def __init__(self, column: Column):
+        present = [i for i in range(len(column)) if column.present[i]]
+        if np is not None:
+            rows = np.asarray(present, dtype=np.intp)
+            order = rows[np.argsort(column.data[rows], kind="stable")]
+            self.rows = order.tolist()
+            self.values = column.data[order].tolist()
+        else:
+            self.rows = sorted(present, key=lambda i: column.data[i])
+            self.values = [column.data[i] for i in self.rows]
+
+    def lookup(self, operator: str, value: Any) -> List[int]:
+        if operator == "Equals":
+            lo, hi = bisect.bisect_left(self.values, value), bisect.bisect_right(self.values, value)
+        elif operator == "GreaterThan":
+            lo, hi = bisect.bisect_right(self.values, value), len(self.values)
+        elif operator == "GreaterThanOrEquals":
+            lo, hi = bisect.bisect_left(self.values, value), len(self.values)
+        elif operator == "LessThan":
+            lo, hi = 0, bisect.bisect_left(self.values, value)
+        else:
+            lo, hi = 0, bisect.bisect_right(self.values, value)
+        return self.rows[lo:hi]
+
+
+class ProductIndex:
+    def __init__(self, table: ProductTable, hash_fields: Iterable[str] = HASH_FIELDS):
+        self.table = table
+        self.hashes: Dict[str, _HashIndex] = {f: _HashIndex(table[f]) for f in hash_fields if f in table}
+        self.sorted: Dict[str, _SortedIndex] = {
+            name: _SortedIndex(c) for name, c in table.columns.items() if c.kind == NUMBER
+        }
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]], fields: Iterable[str] | None = None,
+                  hash_fields: Iterable[str] = HASH_FIELDS) -> "ProductIndex":
+        return cls(ProductTable.from_rows(rows, fields), hash_fields)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def _lookup(self, f: ProductFilter) -> Optional[List[int]]:
+        # Rows matching one filter from an index, or None when no index can answer it
+        prop, operator, value = f["property"], f.get("operator", "Equals"), f.get("value")
+        hashed = self.hashes.get(prop)
+        if hashed is not None:
+            if operator == "Equals":
+                return hashed.get(value)
+            if operator == "In":
+                return _rows(i for v in value for i in hashed.get(v))
+            # Other operators are evaluated once per distinct value instead of once per product
+            if len(hashed) <= SCAN_CANDIDATES:
+                return _rows(i for key in hashed.values() if matches(key, operator, value) for i in hashed.get(key))
+        index = self.sorted.get(prop)
+        if index is not None and _is_number(value) and (operator in RANGE_OPERATORS or operator == "Equals"):
+            return sorted(index.lookup(operator, value))
+        if index is not None and operator == "In" and all(_is_number(v) for v in value):
+            return _rows(i for v in value for i in index.lookup("Equals", v))
+        return None
+
+    def select(self, filters: Iterable[ProductFilter]) -> Sequence[int]:
+        filters = list(filters)
+        candidates: Optional[List[int]] = None
+        remaining = []
+        for f in filters:
+            rows = self._lookup(f)
+            if rows is None:
+                remaining.append(f)
+            else:
+                candidates = rows if candidates is None else _intersect(candidates, rows)
+        if not remaining:
+            return candidates if candidates is not None else list(range(len(self.table)))
+        if candidates is not None and len(candidates) <= SCAN_CANDIDATES:
+            columns = [(self.table[f["property"]], f.get("operator", "Equals"), f.get("value")) for f in remaining]
+            return [i for i in candidates if all(matches(c.value(i), op, v) for c, op, v in columns)]
+        selected = self.table.mask(remaining)
+        if candidates is not None:
+            return [i for i in candidates if selected[i]]
+        if np is not None:
+            return np.flatnonzero(selected).tolist()
+        return [i for i, keep in enumerate(selected) if keep]
+
+    def count(self, filters: Iterable[ProductFilter]) -> int:
+        return len(self.select(filters))
+
+    def filter(self, filters: Iterable[ProductFilter]) -> ProductTable:
+        return self.table.take(self.select(filters))
+
+    def query(self, filters: Iterable[ProductFilter], fields: Iterable[str] | None = None) -> List[Dict[str, Any]]:
+        # Same rows, order and shape as query_products with these filters
+        table = self.table if fields is None else self.table.select(fields)
+        columns = list(table.columns.values())
+        return [{c.name: c.cell(i) for c in columns} for i in self.select(filters)]
+
+    def get(self, guid: str) -> Optional[Dict[str, Any]]:
+        rows = self.hashes["Guid"].get(guid) if "Guid" in self.hashes else self.select(
+            [{"property": "Guid", "value": guid, "operator": "Equals"}])
+        return dict(self.table.row(rows[0])) if rows else None
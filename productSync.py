@@ -0,0 +1,124 @@
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from QonicApiLib import ProductFilter
+
+# Marks a product whose every field must be fetched again, e.g. after it was deleted
+WHOLE_PRODUCT = "*"
+
+
+class ProductSnapshot:
+    # A local copy of a product query that is patched with only the products changed through the client
+    def __init__(self, api: Any, project_id: str, model_id: str, fields: Iterable[str],
+                 filters: Iterable[ProductFilter] | None = None, page_size: int = 1000):
+        self.api = api
+        self.project_id = project_id
+        self.model_id = model_id
+        self.fields = list(fields)
+        if "Guid" not in self.fields:
+            self.fields.insert(0, "Guid")
+        self.filters = list(filters or [])
+        self.page_size = page_size
+        # Fields whose changes can alter what this snapshot holds: its columns and the fields it filters on
+        self.relevant = set(self.fields) | {f["property"] for f in self.filters}
+        self.products: Dict[str, Dict[str, Any]] = {}
+        self.dirty: Dict[str, Set[str]] = {}
+        self.unpublished: Dict[str, Set[str]] = {}
+        self.loads = 0
+        self.syncs = 0
+        self.refetched = 0
+        self._lock = threading.Lock()
+        api.add_change_listener(self.on_change)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def __enter__(self) -> "ProductSnapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.api.remove_change_listener(self.on_change)
+
+    @property
+    def rows(self) -> List[Dict[str, Any]]:
+        return list(self.products.values())
+
+    def get(self, guid: str) -> Optional[Dict[str, Any]]:
+        return self.products.get(guid)
+
+    def load(self) -> "ProductSnapshot":
+        rows = self.api.query_products_iter(self.project_id, self.model_id, self.fields, self.filters,
+                                            page_size=self.page_size)
+        products = {row["Guid"]: row for row in rows}
+        with self._lock:
+            self.products = products
+            self.dirty.clear()
+            self.loads += 1
+        return self
+
+    def touch(self, guid: str, field: str = WHOLE_PRODUCT) -> None:
+        if field != WHOLE_PRODUCT and field not in self.relevant:
+            return
+        with self._lock:
+            self.dirty.setdefault(guid, set()).add(field)
+            self.unpublished.setdefault(guid, set()).add(field)
+
+    def on_change(self, event: str, project_id: str, model_id: str, payload: Any) -> None:
+        if (project_id, model_id) != (self.project_id, self.model_id):
+            return
+        if event == "modify":
+            for products_by_field in (payload or {}).values():
+                for field, products in (products_by_field or {}).items():
+                    for guid in products or ():
+                        self.touch(guid, field)
+        elif event == "delete":
+            self.touch(payload)
+        elif event == "publish":
+            with self._lock:
+                self.unpublished.clear()
+        elif event == "discard":
+            # Discarding reverts every change since the last publish, so those products change back
+            with self._lock:
+                for guid, fields in self.unpublished.items():
+                    self.dirty.setdefault(guid, set()).update(fields)
+                self.unpublished.clear()
+
+    def sync(self) -> Dict[str, int]:
+        with self._lock:
+            dirty, self.dirty = self.dirty, {}
+        result = {"refetched": len(dirty), "updated": 0, "added": 0, "removed": 0}
+        if not dirty:
+            return result
+        try:
+            rows = list(self.api.query_products_by_guid(self.project_id, self.model_id, self.fields, dirty,
+                                                        self.filters, page_size=self.page_size))
+        except BaseException:
+            with self._lock:
+                for guid, fields in dirty.items():
+                    self.dirty.setdefault(guid, set()).update(fields)
+            raise
+        fresh = {row["Guid"]: row for row in rows}
+        with self._lock:
+            for guid in dirty:
+                row = fresh.get(guid)
+                if row is None:
+                    # Deleted, or no longer matching the filters
+                    if self.products.pop(guid, None) is not None:
+                        result["removed"] += 1
+                elif guid in self.products:
+                    self.products[guid] = row
+                    result["updated"] += 1
+                else:
+                    self.products[guid] = row
+                    result["added"] += 1
+            self.syncs += 1
+            self.refetched += len(dirty)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"products": len(self.products), "dirty": len(self.dirty), "unpublished": len(self.unpublished),
+                    "loads": self.loads, "syncs": self.syncs, "refetched": self.refetched}
@@ -0,0 +1,367 @@
+import array
+import math
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from QonicApiLib import ProductFilter
+
+NUMBER = "number"
+CATEGORY = "category"
+OBJECT = "object"
+
+# Columns with more distinct values than this share of their rows (GUIDs, names) are not dictionary encoded
+CATEGORY_RATIO = 0.5
+MIN_CATEGORY_ROWS = 64
+
+
+def matches(row_value: Any, operator: str, value: Any) -> bool:
+    if operator == "In":
+        return row_value in value
+    if operator == "Equals":
+        return row_value == value
+    if operator == "NotEquals":
+        return row_value != value
+    if row_value is None:
+        return False
+    try:
+        if operator == "Contains":
+            return str(value).lower() in str(row_value).lower()
+        if operator == "GreaterThan":
+            return row_value > value
+        if operator == "GreaterThanOrEquals":
+            return row_value >= value
+        if operator == "LessThan":
+            return row_value < value
+        if operator == "LessThanOrEquals":
+            return row_value <= value
+    except TypeError:
+        return False
+    raise ValueError(f"Unknown filter operator {operator!r}")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _buffer(values: array.array) -> Any:
+    # Shares the memory of the array module buffer instead of copying it
+    if np is None:
+        return values
+    return np.frombuffer(values, dtype=np.dtype(values.typecode))
+
+
+def _all(length: int) -> Any:
+    return np.ones(length, dtype=bool) if np is not None else bytearray(b"\x01") * length
+
+
+def _and(a: Any, b: Any) -> Any:
+    if np is not None:
+        return a & b
+    return bytearray(x & y for x, y in zip(a, b))
+
+
+def _indices(mask: Any) -> Sequence[int]:
+    if np is not None:
+        return np.flatnonzero(mask)
+    return [i for i, selected in enumerate(mask) if selected]
+
+
+def _take(data: Any, indices: Sequence[int]) -> Any:
+    if isinstance(data, list):
+        return [data[i] for i in indices]
+    if isinstance(data, bytearray):
+        return bytearray(data[i] for i in indices)
+    if np is not None:
+        return data[np.asarray(indices, dtype=np.intp)]
+    return array.array(data.typecode, (data[i] for i in indices))
+
+
+class Column:
+    def __init__(self, name: str, kind: str, data: Any, categories: List[Any] | None = None,
+                 present: Any = None, pset_codes: Any = None, psets: List[Any] | None = None):
+        self.name = name
+        self.kind = kind
+        # number: int64/float64 values (0 or NaN where missing); category: int32 codes, -1 for None; object: list
+        self.data = data
+        self.categories = categories
+        self.present = present
+        # Only for fields returned as {"PropertySet": ..., "Value": ...}; codes into psets, -1 for None
+        self.pset_codes = pset_codes
+        self.psets = psets
+
+    @property
+    def nested(self) -> bool:
+        return self.pset_codes is not None
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def value(self, i: int) -> Any:
+        if self.kind == NUMBER:
+            if not self.present[i]:
+                return None
+            value = self.data[i]
+            return value.item() if np is not None else value
+        if self.kind == CATEGORY:
+            code = self.data[i]
+            return None if code < 0 else self.categories[code]
+        return self.data[i]
+
+    def property_set(self, i: int) -> Any:
+        if self.pset_codes is None:
+            return None
+        code = self.pset_codes[i]
+        return None if code < 0 else self.psets[code]
+
+    def cell(self, i: int) -> Any:
+        if self.pset_codes is None:
+            return self.value(i)
+        return {"PropertySet": self.property_set(i), "Value": self.value(i)}
+
+    def values(self) -> List[Any]:
+        return [self.value(i) for i in range(len(self))]
+
+    def mask(self, operator: str, value: Any) -> Any:
+        if self.kind == CATEGORY:
+            # Each distinct value is compared once; the last entry answers the -1 (None) code
+            lut = [matches(c, operator, value) for c in self.categories] + [matches(None, operator, value)]
+            if np is not None:
+                return np.array(lut, dtype=bool)[self.data]
+            return bytearray(lut[c] for c in self.data)
+        if self.kind == NUMBER and np is not None:
+            fast = self._number_mask(operator, value)
+            if fast is not None:
+                return fast
+        values = (self.value(i) for i in range(len(self)))
+        if np is not None:
+            return np.fromiter((matches(v, operator, value) for v in values), dtype=bool, count=len(self))
+        return bytearray(matches(v, operator, value) for v in values)
+
+    def _number_mask(self, operator: str, value: Any) -> Any:
+        present = self.present
+        if operator == "In":
+            numbers = [v for v in value if _is_number(v)]
+            result = np.isin(self.data, numbers) & present
+            return result | ~present if None in value else result
+        if not _is_number(value):
+            return None
+        if operator == "Equals":
+            return (self.data == value) & present
+        if operator == "NotEquals":
+            return (self.data != value) | ~present
+        if operator == "GreaterThan":
+            return (self.data > value) & present
+        if operator == "GreaterThanOrEquals":
+            return (self.data >= value) & present
+        if operator == "LessThan":
+            return (self.data < value) & present
+        if operator == "LessThanOrEquals":
+            return (self.data <= value) & present
+        return None
+
+    def take(self, indices: Sequence[int]) -> "Column":
+        return Column(
+            self.name, self.kind, _take(self.data, indices), self.categories,
+            None if self.present is None else _take(self.present, indices),
+            None if self.pset_codes is None else _take(self.pset_codes, indices), self.psets,
+        )
+
+    def groups(self) -> Dict[Any, List[int]]:
+        groups: Dict[Any, List[int]] = defaultdict(list)
+        if self.kind == CATEGORY:
+            for i, code in enumerate(self.data.tolist()):
+                groups[code].append(i)
+            return {None if code < 0 else self.categories[code]: rows for code, rows in groups.items()}
+        for i in range(len(self)):
+            groups[self.value(i)].append(i)
+        return dict(groups)
+
+    def counts(self) -> Dict[Any, int]:
+        if self.kind == CATEGORY:
+            if np is not None:
+                counts = np.bincount(self.data + 1, minlength=len(self.categories) + 1)
+                result = {c: int(n) for c, n in zip(self.categories, counts[1:]) if n}
+                if counts[0]:
+                    result[None] = int(counts[0])
+                return result
+            return {None if code < 0 else self.categories[code]: n for code, n in Counter(self.data).items()}
+        return dict(Counter(self.value(i) for i in range(len(self))))
+
+
+class _ColumnBuilder:
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.codes = array.array("i")
+        self.lookup: Dict[Any, int] = {}
+        self.categories: List[Any] = []
+        self.objects: List[Any] | None = None
+        self.pset_codes: array.array | None = None
+        self.pset_lookup: Dict[Any, int] = {}
+        self.psets: List[Any] = []
+
+    def append(self, cell: Any) -> None:
+        if isinstance(cell, dict) and "Value" in cell:
+            value = cell["Value"]
+            if self.pset_codes is None:
+                self.pset_codes = array.array("i", [-1]) * self.count
+            self.pset_codes.append(self._pset_code(cell.get("PropertySet")))
+        else:
+            value = cell
+            if self.pset_codes is not None:
+                self.pset_codes.append(-1)
+        self.count += 1
+        if self.objects is not None:
+            self.objects.append(value)
+        elif value is None:
+            self.codes.append(-1)
+        else:
+            # The type is part of the key, so 1, 1.0 and True stay distinct values
+            key = (type(value), value)
+            try:
+                code = self.lookup.get(key)
+            except TypeError:
+                self.objects = [None if c < 0 else self.categories[c] for c in self.codes]
+                self.objects.append(value)
+                self.codes = self.lookup = self.categories = None
+                return
+            if code is None:
+                code = self.lookup[key] = len(self.categories)
+                self.categories.append(value)
+            self.codes.append(code)
+
+    def _pset_code(self, pset: Any) -> int:
+        if pset is None:
+            return -1
+        code = self.pset_lookup.get(pset)
+        if code is None:
+            code = self.pset_lookup[pset] = len(self.psets)
+            self.psets.append(pset)
+        return code
+
+    def finish(self) -> Column:
+        pset_codes = None if self.pset_codes is None else _buffer(self.pset_codes)
+        psets = self.psets if self.pset_codes is not None else None
+        if self.objects is not None:
+            return Column(self.name, OBJECT, self.objects, pset_codes=pset_codes, psets=psets)
+        categories = self.categories
+        if categories and all(_is_number(c) for c in categories):
+            integer = all(isinstance(c, int) and -2 ** 63 <= c < 2 ** 63 for c in categories)
+            missing = 0 if integer else math.nan
+            data = array.array("q" if integer else "d", (categories[c] if c >= 0 else missing for c in self.codes))
+            present = bytearray(c >= 0 for c in self.codes)
+            return Column(self.name, NUMBER, _buffer(data),
+                          present=np.frombuffer(present, dtype=bool) if np is not None else present,
+                          pset_codes=pset_codes, psets=psets)
+        if self.count >= MIN_CATEGORY_ROWS and len(categories) > self.count * CATEGORY_RATIO:
+            objects = [None if c < 0 else categories[c] for c in self.codes]
+            return Column(self.name, OBJECT, objects, pset_codes=pset_codes, psets=psets)
+        return Column(self.name, CATEGORY, _buffer(self.codes), categories, pset_codes=pset_codes, psets=psets)
+
+
+class ProductRow(Mapping):
+    # A read-only view of one product; cells are read from the columns on access
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "ProductTable", index: int):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, field: str) -> Any:
+        return self.table.columns[field].cell(self.index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.table.columns)
+
+    def __len__(self) -> int:
+        return len(self.table.columns)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class ProductTable:
+    def __init__(self, columns: Dict[str, Column], length: int):
+        self.columns = columns
+        self.length = length
+        self._index: Dict[Any, int] | None = None
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]], fields: Iterable[str] | None = None) -> "ProductTable":
+        builders = [_ColumnBuilder(f) for f in fields] if fields is not None else None
+        length = 0
+        for row in rows:
+            if builders is None:
+                builders = [_ColumnBuilder(f) for f in row]
+            for builder in builders:
+                builder.append(row.get(builder.name))
+            length += 1
+        return cls({b.name: b.finish() for b in builders or []}, length)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, field: str) -> Column:
+        return self.columns[field]
+
+    def __contains__(self, field: str) -> bool:
+        return field in self.columns
+
+    def __iter__(self) -> Iterator[ProductRow]:
+        return self.rows()
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.columns)
+
+    @property
+    def index(self) -> Dict[Any, int]:
+        if self._index is None:
+            guids = self.columns["Guid"]
+            self._index = {guids.value(i): i for i in range(self.length)}
+        return self._index
+
+    def get(self, guid: str) -> Optional[ProductRow]:
+        i = self.index.get(guid)
+        return None if i is None else ProductRow(self, i)
+
+    def row(self, i: int) -> ProductRow:
+        if not -self.length <= i < self.length:
+            raise IndexError(i)
+        return ProductRow(self, i % self.length)
+
+    def rows(self) -> Iterator[ProductRow]:
+        return (ProductRow(self, i) for i in range(self.length))
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        columns = list(self.columns.values())
+        return [{c.name: c.cell(i) for c in columns} for i in range(self.length)]
+
+    def select(self, fields: Iterable[str]) -> "ProductTable":
+        # Columns are shared, not copied
+        table = ProductTable({f: self.columns[f] for f in fields}, self.length)
+        table._index = self._index if "Guid" in table.columns else None
+        return table
+
+    def mask(self, filters: Iterable[ProductFilter]) -> Any:
+        result = _all(self.length)
+        for f in filters:
+            result = _and(result, self.columns[f["property"]].mask(f.get("operator", "Equals"), f.get("value")))
+        return result
+
+    def take(self, indices: Sequence[int]) -> "ProductTable":
+        return ProductTable({name: c.take(indices) for name, c in self.columns.items()}, len(indices))
+
+    def filter(self, filters: Iterable[ProductFilter]) -> "ProductTable":
+        return self.take(_indices(self.mask(filters)))
+
+    def group_by(self, field: str) -> Dict[Any, "ProductTable"]:
+        return {value: self.take(rows) for value, rows in self.columns[field].groups().items()}
+
+    def count_by(self, field: str) -> Dict[Any, int]:
+        return self.columns[field].counts()
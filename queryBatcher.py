@@ -0,0 +1,94 @@
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from QonicApiLib import ProductFilter
+
+Query = Tuple[str, str, Iterable[str], Optional[Iterable[ProductFilter]]]
+
+
+def filters_key(filters: Iterable[ProductFilter]) -> str:
+    # Filters are combined with AND, so their order does not change the result
+    return json.dumps(sorted(json.dumps(f, sort_keys=True, default=str) for f in filters))
+
+
+def project(rows: List[Dict[str, Any]], fields: Sequence[str], requested: Sequence[str]) -> List[Dict[str, Any]]:
+    if list(fields) == list(requested):
+        return rows
+    return [{f: row.get(f) for f in fields} for row in rows]
+
+
+class _Batch:
+    def __init__(self):
+        self.fields: Dict[str, None] = {}
+        self.done = threading.Event()
+        self.rows: List[Dict[str, Any]] = []
+        self.error: Optional[BaseException] = None
+
+
+class QueryBatcher:
+    # Product queries on the same model and filters that arrive within `window` seconds share one request
+    def __init__(self, api: Any, window: float = 0.01):
+        self.api = api
+        self.window = window
+        self.queries = 0
+        self.requests = 0
+        self._pending: Dict[Tuple[str, str, str], _Batch] = {}
+        self._lock = threading.Lock()
+
+    def query_products(self, project_id: str, model_id: str, fields: Iterable[str],
+                       filters: Iterable[ProductFilter] | None = None) -> List[Dict[str, Any]]:
+        fields = list(fields)
+        filters = list(filters or [])
+        key = (project_id, model_id, filters_key(filters))
+        with self._lock:
+            self.queries += 1
+            batch = self._pending.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._pending[key] = _Batch()
+            batch.fields.update(dict.fromkeys(fields))
+
+        if leader:
+            time.sleep(self.window)
+            with self._lock:
+                # From here on the field set is fixed; later callers start a new batch
+                del self._pending[key]
+                self.requests += 1
+            try:
+                batch.rows = self.api.query_products(project_id, model_id, list(batch.fields), filters)
+            except BaseException as e:
+                batch.error = e
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return project(batch.rows, fields, list(batch.fields))
+
+    def query_many(self, queries: Iterable[Query]) -> List[List[Dict[str, Any]]]:
+        # For a known list of queries: one request per model and filter set, results in input order
+        queries = [(p, m, list(fields), list(filters or [])) for p, m, fields, filters in queries]
+        merged: Dict[Tuple[str, str, str], Dict[str, None]] = {}
+        for project_id, model_id, fields, filters in queries:
+            merged.setdefault((project_id, model_id, filters_key(filters)), {}).update(dict.fromkeys(fields))
+
+        results: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        output = []
+        with self._lock:
+            self.queries += len(queries)
+        for project_id, model_id, fields, filters in queries:
+            key = (project_id, model_id, filters_key(filters))
+            if key not in results:
+                results[key] = self.api.query_products(project_id, model_id, list(merged[key]), filters)
+                with self._lock:
+                    self.requests += 1
+            output.append(project(results[key], fields, list(merged[key])))
+        return output
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"queries": self.queries, "requests": self.requests, "merged": self.queries - self.requests}
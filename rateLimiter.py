@@ -0,0 +1,129 @@
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+THROTTLE_STATUSES = (429, 503)
+# A 503 from a gateway does not prove the request was not processed, so only these are resent on a bare 503
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def retryable(method: str, status: int, retry_after: Optional[float]) -> bool:
+    # 429 means the request was rejected before processing; a 503 is safe to resend for idempotent methods,
+    # or when the server asks for a retry with Retry-After
+    if status == 429:
+        return True
+    return status == 503 and (method.upper() in IDEMPOTENT_METHODS or retry_after is not None)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class AdaptiveLimiter:
+    # AIMD: every successful request grows the in-flight limit by about one per round trip,
+    # every throttling response shrinks it by `decrease`, at most once per `cooldown` seconds.
+    def __init__(
+            self,
+            initial_limit: int = 8,
+            min_limit: int = 1,
+            max_limit: int = 64,
+            decrease: float = 0.5,
+            cooldown: float = 1.0,
+            max_retries: int = 5,
+            base_delay: float = 0.5,
+            max_delay: float = 30.0,
+            rate_window: float = 10.0,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate_window = rate_window
+        self.in_flight = 0
+        self.waiting = 0
+        self.throttled = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._completed: deque[float] = deque()
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            self.waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    if now < self._blocked_until:
+                        self._cond.wait(self._blocked_until - now)
+                    elif self.in_flight >= int(self.limit):
+                        self._cond.wait()
+                    else:
+                        break
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+
+    def release(self, throttled: bool = False, retry_after: Optional[float] = None) -> None:
+        with self._cond:
+            now = time.monotonic()
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(float(self.min_limit), self.limit * self.decrease)
+                    self._last_decrease = now
+                if retry_after:
+                    self._blocked_until = max(self._blocked_until, now + retry_after)
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+                self._completed.append(now)
+                self._trim(now)
+            self._cond.notify_all()
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.base_delay)
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def _trim(self, now: float) -> None:
+        while self._completed and now - self._completed[0] > self.rate_window:
+            self._completed.popleft()
+
+    @property
+    def rate(self) -> float:
+        with self._cond:
+            self._trim(time.monotonic())
+            return len(self._completed) / self.rate_window
+
+    @property
+    def queue_depth(self) -> int:
+        return self.waiting
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "rate": self.rate,
+            "throttled": self.throttled,
+        }
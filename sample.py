@@ -5,10 +5,12 @@ import os
 import json
 from typing import Callable
 
-import requests
 from QonicApi import QonicApi
 import printMethods
+from changeSet import ChangeSet
 from QonicApiLib import ProductFilter
+from cassette import Cassette
+from transport import Transport
 
 
 def wait_for_operation(api: QonicApi, operation_id: str):
@@ -22,16 +24,12 @@ def wait_for_operation(api: QonicApi, operation_id: str):
 
 
 def run_product_modification(api: QonicApi, project_id: str, model_id: str, changes: dict) -> bool:
-    print("Starting modification session")
-    api.start_session(project_id, model_id)
-    try:
-        errors = api.modify_products(project_id, model_id, changes)
-        if errors:
-            print(errors)
-            return False
-    finally:
-        print("Closing modification session")
-        api.end_session(project_id, model_id)
+    print("Submitting changes in one modification session")
+    result = ChangeSet.from_changes(changes, api.codec).submit(api, project_id, model_id)
+    print(result.report())
+    if result.errors:
+        print(result.errors)
+        return False
 
     print("Modification is done")
     print()
@@ -447,9 +445,7 @@ def handle_create_model(api: QonicApi, project_id: str):
 
     upload_file_name = os.path.basename(local_path)
     print(f"Uploading {upload_file_name} to storage")
-    with open(local_path, "rb") as f:
-        resp = requests.put(upload_url, data=f)
-        resp.raise_for_status()
+    api.transport.upload(upload_url, local_path)
     print("Upload finished")
 
     model_name = upload_file_name if "." not in upload_file_name else upload_file_name.split(".")[0]
@@ -528,13 +524,7 @@ def handle_export_model(api: "QonicApi", project_id: str) -> None:
     result_url = api.get_export_ifc_result_url(project_id, model_id, operation_id)
 
     print(f"Downloading IFC file to {output_path}")
-    resp = requests.get(result_url, stream=True)
-    resp.raise_for_status()
-
-    with open(output_path, "wb") as f:
-        for chunk in resp.iter_content(chunk_size=8192):
-            if chunk:
-                f.write(chunk)
+    api.transport.download(result_url, output_path)
     print(f"IFC file saved to {output_path}")
 
 def handle_calculate_quantities(api: QonicApi, project_id: str):
@@ -569,8 +559,7 @@ def handle_calculate_quantities(api: QonicApi, project_id: str):
 
     result_url = api.get_quantities_result_url(project_id, model_id, operation_id)
     print("Downloading quantities result")
-    resp = requests.get(result_url)
-    resp.raise_for_status()
+    resp = api.transport.fetch(result_url)
 
     try:
         data = resp.json()
@@ -610,11 +599,17 @@ def _choose_action(actions: dict[str, tuple[str, Callable[[], None]]]) -> str:
     return input(f"Enter choice ({', '.join(actions.keys())}): ").strip()
 
 def main() -> None:
-    api = QonicApi()
-    api.authorize()
+    # QONIC_CASSETTE records this run to a file, or replays it offline with QONIC_CASSETTE_MODE=replay
+    cassette = Cassette.from_env()
+    api = QonicApi(transport=Transport(cassette=cassette))
+    if cassette is not None and cassette.mode == "replay":
+        api.access_token = "replay"
+    else:
+        api.authorize()
 
     project_id = _choose_project(api.list_projects())
     if not project_id:
+        api.close()
         return
 
     actions: dict[str, tuple[str, Callable[[], None]]] = {
@@ -643,6 +638,8 @@ def main() -> None:
 
     except (KeyboardInterrupt, EOFError):
         print("\nExiting...")
+    finally:
+        api.close()
 
 
 if __name__ == "__main__":
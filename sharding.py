@@ -0,0 +1,69 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from QonicApiLib import ProductFilter
+
+
+class Shard:
+    def __init__(self, index: int, filters: List[ProductFilter], expected_rows: Optional[int] = None):
+        self.index = index
+        self.filters = filters
+        self.expected_rows = expected_rows
+        self.rows = 0
+        self.duplicates = 0
+        self.seconds = 0.0
+        self.error: Optional[BaseException] = None
+
+    def __repr__(self) -> str:
+        return f"Shard({self.index}, rows={self.rows}, duplicates={self.duplicates}, seconds={self.seconds:.3f})"
+
+
+class ShardedResult:
+    def __init__(self, rows: List[Dict[str, Any]], shards: List[Shard], plan_seconds: float, seconds: float):
+        self.rows = rows
+        self.shards = shards
+        self.plan_seconds = plan_seconds
+        self.seconds = seconds
+
+    @property
+    def duplicates(self) -> int:
+        return sum(s.duplicates for s in self.shards)
+
+    def report(self) -> str:
+        lines = [f"{'shard':>5} {'rows':>9} {'dupes':>7} {'seconds':>9}  filter"]
+        for s in self.shards:
+            partition = s.filters[-1] if s.filters else {}
+            values = partition.get("value")
+            label = f"{partition.get('property')} {partition.get('operator')} {values}" if partition else "-"
+            lines.append(f"{s.index:>5} {s.rows:>9} {s.duplicates:>7} {s.seconds:>9.3f}  {label[:60]}")
+        slowest = max((s.seconds for s in self.shards), default=0.0)
+        lines.append(f"planned in {self.plan_seconds:.3f}s, {len(self.rows)} rows in {self.seconds:.3f}s "
+                     f"(slowest shard {slowest:.3f}s)")
+        return "\n".join(lines)
+
+
+def plan_shards(counts: Mapping[Any, int], shards: int, prop: str = "Class") -> List[List[ProductFilter]]:
+    # Largest values first, each into the currently smallest shard, so the shards end up about equally long
+    bins: List[List[Any]] = [[] for _ in range(max(1, min(shards, len(counts))))]
+    sizes = [0] * len(bins)
+    ordered = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+    for value, count in ordered:
+        smallest = sizes.index(min(sizes))
+        bins[smallest].append(value)
+        sizes[smallest] += count
+    return [[{"property": prop, "value": values, "operator": "In"}] for values in bins if values]
+
+
+def merge_shards(results: Iterable[List[Dict[str, Any]]], shards: List[Shard], key: str = "Guid") -> List[Dict[str, Any]]:
+    # Shards are merged in plan order, so the output does not depend on which request finished first
+    seen = set()
+    merged = []
+    for shard, rows in zip(shards, results):
+        shard.rows = len(rows)
+        for row in rows:
+            guid = row.get(key)
+            if guid in seen:
+                shard.duplicates += 1
+                continue
+            seen.add(guid)
+            merged.append(row)
+    return merged
@@ -0,0 +1,119 @@
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+import requests
+
+if TYPE_CHECKING:
+    from tokenStore import TokenStore
+
+
+class TokenManager:
+    def __init__(self, renew: Callable[[str], Optional[Dict[str, Any]]], store: "TokenStore | None" = None,
+                 lead_time: float = 300.0, lead_fraction: float = 0.2, retry_delay: float = 5.0,
+                 max_retry_delay: float = 60.0):
+        self.renew = renew
+        self.store = store
+        self.lead_time = lead_time
+        self.lead_fraction = lead_fraction
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        # Read without locking by every request; replaced as a whole, never mutated
+        self.authorization: Optional[str] = None
+        self._token: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+        self.renewals = 0
+        self.failures = 0
+
+    @property
+    def access_token(self) -> Optional[str]:
+        return self._token["access_token"] if self._token else None
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        return self._token.get("expires_at") if self._token else None
+
+    def set(self, token: Dict[str, Any]) -> None:
+        token = dict(token)
+        if "expires_in" in token and "expires_at" not in token:
+            token["expires_at"] = time.time() + float(token["expires_in"])
+        self._token = token
+        self.authorization = f"Bearer {token['access_token']}"
+        self._wake.set()
+        if token.get("expires_at") and token.get("refresh_token"):
+            self._ensure_thread()
+
+    def renew_at(self) -> Optional[float]:
+        token = self._token
+        if not token or not token.get("expires_at") or not token.get("refresh_token"):
+            return None
+        expires_at = float(token["expires_at"])
+        lifetime = float(token.get("expires_in") or self.lead_time / self.lead_fraction)
+        # Renew a fixed time ahead, but never later than the last fifth of a short-lived token
+        return expires_at - max(min(self.lead_time, lifetime * self.lead_fraction), 1.0)
+
+    def renew_now(self, stale_authorization: Optional[str] = None) -> bool:
+        with self._lock:
+            # Whoever saw the same expired token first has already renewed it
+            if stale_authorization is not None and self.authorization != stale_authorization:
+                return True
+            token = self._token
+            if not token or not token.get("refresh_token"):
+                return False
+            try:
+                renewed = self.renew(token["refresh_token"])
+            except requests.RequestException:
+                renewed = None
+            if not renewed:
+                self.failures += 1
+                return False
+            if self.store is not None:
+                renewed = self.store.save(renewed)
+            self.set(renewed)
+            self.renewals += 1
+            return True
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="qonic-token-renewal", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        delay = self.retry_delay
+        while not self._stopped:
+            self._wake.clear()
+            renew_at = self.renew_at()
+            if renew_at is None:
+                self._wake.wait()
+                continue
+            wait = renew_at - time.time()
+            if wait > 0:
+                # Woken early when a new token is installed, then the schedule is recomputed
+                self._wake.wait(wait)
+                continue
+            if self.renew_now():
+                delay = self.retry_delay
+                continue
+            # Keep trying until the old token runs out; requests keep using it meanwhile
+            self._wake.wait(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+
+    def close(self) -> None:
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        expires_at = self.expires_at
+        return {
+            "renewals": self.renewals,
+            "failures": self.failures,
+            "expires_in": None if expires_at is None else max(float(expires_at) - time.time(), 0.0),
+            "renew_in": None if self.renew_at() is None else max(self.renew_at() - time.time(), 0.0),
+        }
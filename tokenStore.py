@@ -0,0 +1,91 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+
+# Tokens are treated as expired this many seconds early, so a request never leaves with a token about to lapse
+EXPIRY_MARGIN = 60
+
+KEYRING_SERVICE = "qonic-token"
+
+
+def default_path() -> Path:
+    return Path(os.getenv("QONIC_TOKEN_PATH", Path.home() / ".cache" / "qonic" / "token"))
+
+
+def _write_private(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+
+
+class TokenStore:
+    def __init__(self, path: str | Path | None = None, key: str | bytes | None = None, namespace: str = ""):
+        self.path = Path(path) if path else default_path()
+        self.key_path = self.path.with_suffix(".key")
+        self.namespace = namespace
+        self._fernet = Fernet(key or os.getenv("QONIC_TOKEN_KEY") or self._load_or_create_key())
+
+    def _keyring(self) -> Any:
+        try:
+            import keyring
+        except ImportError:
+            return None
+        return keyring
+
+    def _load_or_create_key(self) -> bytes:
+        # The OS keyring keeps the key out of reach of anyone who can read the token file. Without it the key is
+        # stored next to the token with the same permissions, which only obfuscates the file.
+        keyring = self._keyring()
+        if keyring is not None:
+            try:
+                key = keyring.get_password(KEYRING_SERVICE, str(self.path))
+                if key is None:
+                    # A key file left from before keyring was available moves into the keyring
+                    key = (self.key_path.read_bytes().strip() if self.key_path.exists()
+                           else Fernet.generate_key()).decode("ascii")
+                    keyring.set_password(KEYRING_SERVICE, str(self.path), key)
+                    self.key_path.unlink(missing_ok=True)
+                return key.encode("ascii")
+            except Exception:
+                # No usable backend (headless machines, containers): fall back to the key file
+                pass
+        if self.key_path.exists():
+            return self.key_path.read_bytes().strip()
+        key = Fernet.generate_key()
+        _write_private(self.key_path, key)
+        return key
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not self.path.exists():
+            return None
+        try:
+            data = json.loads(self._fernet.decrypt(self.path.read_bytes()))
+        except (InvalidToken, ValueError):
+            return None
+        # A token issued for another client or API is never reused
+        if data.get("namespace") != self.namespace:
+            return None
+        return data.get("token")
+
+    def save(self, token: Dict[str, Any]) -> Dict[str, Any]:
+        token = dict(token)
+        if "expires_in" in token and "expires_at" not in token:
+            token["expires_at"] = time.time() + float(token["expires_in"])
+        payload = json.dumps({"namespace": self.namespace, "token": token}).encode("utf-8")
+        _write_private(self.path, self._fernet.encrypt(payload))
+        return token
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+    @staticmethod
+    def is_valid(token: Optional[Dict[str, Any]], margin: float = EXPIRY_MARGIN) -> bool:
+        if not token or not token.get("access_token"):
+            return False
+        expires_at = token.get("expires_at")
+        return expires_at is None or float(expires_at) - margin > time.time()
@@ -0,0 +1,165 @@
+import socket
+import threading
+from typing import Any, BinaryIO, Dict
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from cassette import Cassette, CassetteAdapter
+
+
+def accept_encoding() -> str:
+    # urllib3 only decodes brotli bodies when a brotli package is installed
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+        except ImportError:
+            return "gzip, deflate"
+    return "gzip, deflate, br"
+
+
+def keep_alive_socket_options(idle: int, interval: int, count: int) -> list:
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # The fine grained TCP keep-alive knobs are not available on every platform
+    for name, value in (("TCP_KEEPIDLE", idle), ("TCP_KEEPINTVL", interval), ("TCP_KEEPCNT", count)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+class PooledAdapter(HTTPAdapter):
+    def __init__(self, socket_options: list | None = None, **kwargs):
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self.socket_options is not None:
+            pool_kwargs["socket_options"] = self.socket_options
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        stats = {}
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = f"{pool.scheme}://{pool.host}:{pool.port}"
+            entry = stats.setdefault(host, {"requests": 0, "connections": 0, "reused": 0})
+            entry["requests"] += pool.num_requests
+            entry["connections"] += pool.num_connections
+            entry["reused"] += max(pool.num_requests - pool.num_connections, 0)
+        return stats
+
+
+class Transport:
+    def __init__(
+            self,
+            *,
+            pool_connections: int = 4,
+            pool_maxsize: int = 32,
+            pool_block: bool = True,
+            storage_pool_maxsize: int = 16,
+            keep_alive: bool = True,
+            keep_alive_idle: int = 60,
+            keep_alive_interval: int = 15,
+            keep_alive_count: int = 4,
+            cassette: Cassette | None = None,
+    ):
+        socket_options = None
+        if keep_alive:
+            socket_options = keep_alive_socket_options(keep_alive_idle, keep_alive_interval, keep_alive_count)
+
+        self.api_session = requests.Session()
+        self._local = threading.local()
+        self.api_adapter = self._mount(self.api_session, PooledAdapter(
+            socket_options=socket_options,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        ))
+
+        # Pre-signed storage URLs carry their own credentials, so they get a session without API headers
+        self.storage_session = requests.Session()
+        self.storage_adapter = self._mount(self.storage_session, PooledAdapter(
+            socket_options=socket_options,
+            pool_connections=pool_connections,
+            pool_maxsize=storage_pool_maxsize,
+            pool_block=pool_block,
+        ))
+
+        # A cassette sits in front of both pools to record or replay every exchange
+        self.cassette = cassette
+        if cassette is not None:
+            self._mount(self.api_session, CassetteAdapter(cassette, self.api_adapter))
+            self._mount(self.storage_session, CassetteAdapter(cassette, self.storage_adapter))
+
+    @staticmethod
+    def _mount(session: requests.Session, adapter: HTTPAdapter | CassetteAdapter):
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return adapter
+
+    def _thread_copy(self, name: str, shared: requests.Session) -> requests.Session:
+        # requests.Session keeps mutable per-request state and is not documented as thread safe, so every
+        # thread gets its own; they all mount the same adapters and so share one connection pool
+        session = getattr(self._local, name, None)
+        if session is None:
+            session = requests.Session()
+            for prefix, adapter in shared.adapters.items():
+                session.mount(prefix, adapter)
+            session.headers = shared.headers.copy()
+            setattr(self._local, name, session)
+        return session
+
+    def thread_session(self) -> requests.Session:
+        return self._thread_copy("session", self.api_session)
+
+    def storage_thread_session(self) -> requests.Session:
+        return self._thread_copy("storage_session", self.storage_session)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        return self.thread_session().request(method, url, **kwargs)
+
+    def fetch(self, url: str, **kwargs) -> requests.Response:
+        resp = self.storage_thread_session().get(url, **kwargs)
+        resp.raise_for_status()
+        return resp
+
+    def upload(self, url: str, source: str | Path | BinaryIO) -> requests.Response:
+        session = self.storage_thread_session()
+        if isinstance(source, (str, Path)):
+            with open(source, "rb") as f:
+                resp = session.put(url, data=f)
+        else:
+            resp = session.put(url, data=source)
+        resp.raise_for_status()
+        return resp
+
+    def download(self, url: str, output_path: str | Path, chunk_size: int = 1024 * 1024) -> int:
+        written = 0
+        with self.storage_thread_session().get(url, stream=True) as resp:
+            resp.raise_for_status()
+            with open(output_path, "wb") as f:
+                for chunk in resp.iter_content(chunk_size=chunk_size):
+                    if chunk:
+                        f.write(chunk)
+                        written += len(chunk)
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "api": self.api_adapter.pool_stats(),
+            "storage": self.storage_adapter.pool_stats(),
+        }
+
+    def close(self) -> None:
+        self.api_session.close()
+        self.storage_session.close()
+        if self.cassette is not None and self.cassette.mode == "record":
+            self.cassette.save()